@@ -0,0 +1,40 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET_MS = 150.0
+
+COMMANDS = {
+    "import": [sys.executable, "-c", "import non_linear_cli.main"],
+    "help": [sys.executable, "-m", "non_linear_cli.main", "-h"],
+}
+
+
+def measure(command: list[str], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI startup time against its budget")
+    parser.add_argument("-r", "--repeat", type=int, default=15, help="Runs per measurement, the median is reported")
+    parser.add_argument("-b", "--budget", type=float, default=BUDGET_MS, help="Allowed milliseconds per command")
+    args = parser.parse_args()
+    interpreter = measure([sys.executable, "-c", "pass"], args.repeat)
+    print(f"interpreter: {interpreter:.1f}ms")
+    over_budget = False
+    for name, command in COMMANDS.items():
+        elapsed = measure(command, args.repeat) - interpreter
+        over_budget |= elapsed > args.budget
+        print(f"{name}: {elapsed:.1f}ms over interpreter startup, budget {args.budget:.0f}ms")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
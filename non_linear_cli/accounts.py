@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+
+from construct import Construct
+from solana.rpc.api import Client
+from solana.rpc.types import MemcmpOpts
+from solders.account import Account
+from solders.pubkey import Pubkey
+
+from .client.types import Contract, StreamContract
+from .decoder import contract_decoder, stream_contract_decoder
+from .pda import derive_many
+
+STREAM_CONTRACT_SIZE = 1104
+MAX_ACCOUNTS_PER_REQUEST = 100
+
+
+@dataclass
+class ProxyStream:
+    stream_id: Pubkey
+    stream: StreamContract
+    streamflow_program: Pubkey
+    proxy_id: Pubkey
+    proxy: Contract | None
+
+
+def field_offset(layout: Construct, name: str) -> int:
+    offset = 0
+    for subcon in layout.subcons:
+        if subcon.name == name:
+            return offset
+        offset += subcon.sizeof()
+    raise KeyError(name)
+
+
+CONTRACT_OFFSETS = {name: field_offset(Contract.layout, name) for name in ("sender", "recipient", "mint")}
+STREAM_CONTRACT_OFFSETS = {name: field_offset(StreamContract.layout, name) for name in ("sender", "recipient", "mint")}
+
+
+def build_filters(
+    offsets: dict[str, int],
+    sender: Pubkey | None = None,
+    recipient: Pubkey | None = None,
+    mint: Pubkey | None = None,
+    data_size: int | None = None,
+) -> list[int | MemcmpOpts]:
+    filters: list[int | MemcmpOpts] = []
+    if data_size is not None:
+        filters.append(data_size)
+    for name, value in (("sender", sender), ("recipient", recipient), ("mint", mint)):
+        if value is not None:
+            filters.append(MemcmpOpts(offset=offsets[name], bytes=str(value)))
+    return filters
+
+
+def decode_contract(data: bytes) -> Contract | None:
+    try:
+        return contract_decoder.decode(data)
+    except Exception:
+        return None
+
+
+def decode_stream_contract(data: bytes) -> StreamContract | None:
+    try:
+        return stream_contract_decoder.decode(data)
+    except Exception:
+        return None
+
+
+def withdrawable_amount(stream: StreamContract, now: int) -> int:
+    ix = stream.ix
+    if stream.closed or ix.period == 0:
+        return 0
+    if stream.current_pause_start:
+        now = stream.current_pause_start
+    now -= stream.pause_cumulative
+    if now < ix.start_time:
+        return 0
+    if stream.last_rate_change_time:
+        start, unlocked = stream.last_rate_change_time, stream.funds_unlocked_at_last_rate_change
+    else:
+        start, unlocked = ix.start_time, ix.cliff_amount
+    unlocked += max(now - start, 0) // ix.period * ix.amount_per_period
+    return max(min(unlocked, ix.net_amount_deposited) - stream.amount_withdrawn, 0)
+
+
+def get_contracts(
+    client: Client,
+    program: Pubkey,
+    sender: Pubkey | None = None,
+    recipient: Pubkey | None = None,
+    mint: Pubkey | None = None,
+) -> list[tuple[Pubkey, Contract]]:
+    filters = build_filters(CONTRACT_OFFSETS, sender, recipient, mint)
+    resp = client.get_program_accounts(program, encoding="base64", filters=filters or None)
+    contracts = []
+    for keyed_account in resp.value:
+        contract = decode_contract(keyed_account.account.data)
+        if contract is not None:
+            contracts.append((keyed_account.pubkey, contract))
+    return contracts
+
+
+def get_stream_contracts(
+    client: Client,
+    streamflow_program: Pubkey,
+    sender: Pubkey | None = None,
+    recipient: Pubkey | None = None,
+    mint: Pubkey | None = None,
+) -> list[tuple[Pubkey, StreamContract]]:
+    filters = build_filters(STREAM_CONTRACT_OFFSETS, sender, recipient, mint, data_size=STREAM_CONTRACT_SIZE)
+    resp = client.get_program_accounts(streamflow_program, encoding="base64", filters=filters)
+    streams = []
+    for keyed_account in resp.value:
+        stream = decode_stream_contract(keyed_account.account.data)
+        if stream is not None:
+            streams.append((keyed_account.pubkey, stream))
+    return streams
+
+
+def get_accounts(client: Client, keys: list[Pubkey]) -> list[Account | None]:
+    accounts: list[Account | None] = []
+    for start in range(0, len(keys), MAX_ACCOUNTS_PER_REQUEST):
+        accounts += client.get_multiple_accounts(keys[start : start + MAX_ACCOUNTS_PER_REQUEST]).value
+    return accounts
+
+
+def get_proxy_streams(client: Client, program: Pubkey, stream_ids: list[Pubkey]) -> list[ProxyStream | None]:
+    proxy_ids = derive_many(([bytes(stream_id)], program) for stream_id in stream_ids)
+    keys: list[Pubkey] = []
+    for stream_id, proxy_id in zip(stream_ids, proxy_ids, strict=True):
+        keys += [stream_id, proxy_id]
+    accounts = get_accounts(client, keys)
+    proxy_streams: list[ProxyStream | None] = []
+    for i, stream_id in enumerate(stream_ids):
+        stream_account, proxy_account = accounts[2 * i], accounts[2 * i + 1]
+        stream = decode_stream_contract(stream_account.data) if stream_account is not None else None
+        if stream is None:
+            proxy_streams.append(None)
+            continue
+        proxy_streams.append(
+            ProxyStream(
+                stream_id=stream_id,
+                stream=stream,
+                streamflow_program=stream_account.owner,
+                proxy_id=keys[2 * i + 1],
+                proxy=decode_contract(proxy_account.data) if proxy_account is not None else None,
+            )
+        )
+    return proxy_streams
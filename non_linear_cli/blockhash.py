@@ -0,0 +1,57 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from solana.rpc.api import Client
+from solana.rpc.commitment import Commitment
+from solders.hash import Hash
+
+
+@dataclass(frozen=True)
+class LatestBlockhash:
+    blockhash: Hash
+    last_valid_block_height: int
+    fetched_at: float
+
+
+class BlockhashProvider:
+    def __init__(self, client: Client, refresh_interval: float = 5.0, max_age: float = 30.0):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self._latest: dict[Commitment, LatestBlockhash] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get(self, commitment: Commitment) -> LatestBlockhash:
+        latest = self._latest.get(commitment)
+        if latest is None or time.monotonic() - latest.fetched_at > self.max_age:
+            latest = self.refresh(commitment)
+            with self._lock:
+                self._ensure_running()
+        return latest
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh(self, commitment: Commitment) -> LatestBlockhash:
+        value = self.client.get_latest_blockhash(commitment).value
+        latest = LatestBlockhash(value.blockhash, value.last_valid_block_height, time.monotonic())
+        self._latest[commitment] = latest
+        return latest
+
+    def _ensure_running(self):
+        if not self._stop.is_set() and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="blockhash-provider", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            for commitment in list(self._latest):
+                try:
+                    self.refresh(commitment)
+                except Exception:
+                    continue
@@ -1,18 +1,22 @@
 import typing
 import re
-from solders.transaction_status import (
-    InstructionErrorCustom,
-    TransactionErrorInstructionError,
-)
-from solana.rpc.core import RPCException
-from solders.rpc.errors import SendTransactionPreflightFailureMessage
-from anchorpy.error import extract_code_and_logs
-from ..program_id import PROGRAM_ID
-from . import anchor
-from . import custom
-
-
-def from_code(code: int) -> typing.Union[custom.CustomError, anchor.AnchorError, None]:
+import importlib
+
+if typing.TYPE_CHECKING:
+    from solana.rpc.core import RPCException
+    from . import anchor
+    from . import custom
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in ("anchor", "custom"):
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def from_code(code: int) -> "typing.Union[custom.CustomError, anchor.AnchorError, None]":
+    from . import anchor, custom
+
     return custom.from_code(code) if code >= 6000 else anchor.from_code(code)
 
 
@@ -20,8 +24,11 @@ error_re = re.compile(r"Program (\w+) failed: custom program error: (\w+)")
 
 
 def from_tx_error(
-    error: RPCException,
-) -> typing.Union[anchor.AnchorError, custom.CustomError, None]:
+    error: "RPCException",
+) -> "typing.Union[anchor.AnchorError, custom.CustomError, None]":
+    from anchorpy.error import extract_code_and_logs
+    from ..program_id import PROGRAM_ID
+
     err_info = error.args[0]
     extracted = extract_code_and_logs(err_info, PROGRAM_ID)
     if extracted is None:
@@ -0,0 +1,82 @@
+import copy
+import math
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
+
+from solana.rpc.api import Client
+from solana.transaction import Transaction
+from solders.compute_budget import set_compute_unit_limit
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+
+COMPUTE_BUDGET_PROGRAM_ID = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+SET_COMPUTE_UNIT_LIMIT = 2
+MAX_COMPUTE_UNITS = 1_400_000
+DEFAULT_MARGIN = 0.1
+
+Shape = tuple[tuple[Pubkey, bytes, int], ...]
+
+
+def is_compute_unit_limit(ix: Instruction) -> bool:
+    return ix.program_id == COMPUTE_BUDGET_PROGRAM_ID and ix.data[:1] == bytes([SET_COMPUTE_UNIT_LIMIT])
+
+
+def transaction_shape(instructions: Sequence[Instruction]) -> Shape:
+    return tuple(
+        (ix.program_id, bytes(ix.data[:8]), len(ix.accounts))
+        for ix in instructions
+        if ix.program_id != COMPUTE_BUDGET_PROGRAM_ID
+    )
+
+
+class ComputeUnitEstimator:
+    def __init__(self, client: Client, margin: float = DEFAULT_MARGIN):
+        self.client = client
+        self.margin = margin
+        self._units: dict[Shape, Future] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, tx: Transaction) -> int | None:
+        shape = transaction_shape(tx.instructions)
+        with self._lock:
+            future = self._units.get(shape)
+            owner = future is None
+            if owner:
+                future = self._units[shape] = Future()
+        if owner:
+            try:
+                units = self._simulate(tx)
+            except Exception:
+                units = None
+            if units is None:
+                with self._lock:
+                    del self._units[shape]
+            future.set_result(units)
+        units = future.result()
+        if units is None:
+            return None
+        return min(math.ceil(units * (1 + self.margin)), MAX_COMPUTE_UNITS)
+
+    def apply(self, tx: Transaction):
+        limit = self.limit(tx)
+        if limit is None:
+            return
+        instructions = [ix for ix in tx.instructions if not is_compute_unit_limit(ix)]
+        tx.instructions = [set_compute_unit_limit(limit), *instructions]
+
+    def _simulate(self, tx: Transaction) -> int | None:
+        instructions = [set_compute_unit_limit(MAX_COMPUTE_UNITS)]
+        instructions += [ix for ix in tx.instructions if not is_compute_unit_limit(ix)]
+        if isinstance(tx, Transaction):
+            simulated = Transaction(
+                recent_blockhash=tx.recent_blockhash, fee_payer=tx.fee_payer, instructions=instructions
+            )
+        else:
+            simulated = copy.copy(tx)
+            simulated.instructions = instructions
+            simulated = simulated.unsigned()
+        value = self.client.simulate_transaction(simulated).value
+        if value.err is not None or not value.units_consumed:
+            return None
+        return value.units_consumed
@@ -0,0 +1,322 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from solana.rpc.api import Client
+from solana.rpc.commitment import Commitment, Confirmed, Finalized
+from solana.rpc.core import _COMMITMENT_TO_SOLDERS
+from solana.rpc.types import TxOpts
+from solana.transaction import Transaction
+from solders.keypair import Keypair
+from solders.signature import Signature
+
+from .blockhash import BlockhashProvider
+from .compute import ComputeUnitEstimator
+from .errors import RETRYABLE, RETRYABLE_TRANSACTION_ERRORS, classify, transaction_error
+from .fees import PriorityFeeEstimator
+from .ledger import EXPIRED, FAILED, Ledger
+from .rpc import get_block_height_and_statuses
+from .subscriptions import SignatureSubscriber
+
+MAX_SIGNATURES_PER_REQUEST = 256
+SEND_ATTEMPTS = 3
+MAX_POLL_FAILURES = 20
+SEND_WORKERS = 4
+
+
+class TransactionExpiredError(Exception):
+    def __init__(self, signature: Signature):
+        super().__init__(f"Unable to confirm the transaction: {signature}")
+        self.signature = signature
+
+
+class TransactionFailedError(Exception):
+    def __init__(self, signature: Signature, err: object, logs: list[str] | None = None):
+        super().__init__(f"Transaction {signature} failed: {err}")
+        self.signature = signature
+        self.err = err
+        self.logs = logs
+
+
+@dataclass
+class PendingTransaction:
+    signature: Signature
+    raw: bytes
+    commitment: Commitment
+    last_valid_block_height: int
+    tx: Transaction | None
+    signers: tuple[Keypair, ...]
+    future: Future = field(default_factory=Future)
+    bumps: int = 0
+    seen: bool = False
+    last_sent_at: float = field(default_factory=time.monotonic)
+
+
+class ConfirmationEngine:
+    def __init__(
+        self,
+        client: Client,
+        blockhashes: BlockhashProvider | None = None,
+        poll_interval: float = 0.5,
+        resend_interval: float = 2.0,
+        websocket_url: str | None = None,
+        subscribed_poll_interval: float = 5.0,
+        compute_units: ComputeUnitEstimator | None = None,
+        fees: PriorityFeeEstimator | None = None,
+        ledger: Ledger | None = None,
+        send_attempts: int = SEND_ATTEMPTS,
+        retry_backoff: float = 0.5,
+        max_poll_failures: int = MAX_POLL_FAILURES,
+    ):
+        self.client = client
+        self.blockhashes = blockhashes or BlockhashProvider(client)
+        self.poll_interval = poll_interval
+        self.resend_interval = resend_interval
+        self.subscribed_poll_interval = subscribed_poll_interval
+        self.compute_units = compute_units
+        self.fees = fees
+        self.ledger = ledger
+        self.send_attempts = send_attempts
+        self.retry_backoff = retry_backoff
+        self.max_poll_failures = max_poll_failures
+        self._wakeup = threading.Event()
+        self.subscriber = None
+        if websocket_url:
+            self.subscriber = SignatureSubscriber(websocket_url, self._on_notification, self._wakeup.set)
+        self._pending: dict[Signature, PendingTransaction] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(max_workers=SEND_WORKERS, thread_name_prefix="confirmation-send")
+
+    def submit(self, tx: Transaction, *signers: Keypair, commitment: Commitment = Finalized) -> Future:
+        return self._send(tx, signers, commitment, Future(), 0)
+
+    def submit_later(self, tx: Transaction, *signers: Keypair, commitment: Commitment = Finalized) -> Future:
+        future = Future()
+        self._executor.submit(self._send_or_fail, tx, signers, commitment, future, 0)
+        return future
+
+    def submit_signed(self, raw: bytes, valid_blocks: int, commitment: Commitment = Finalized) -> Future:
+        last_valid_block_height = self.blockhashes.get(commitment).last_valid_block_height + valid_blocks
+        signature = self.client.send_raw_transaction(
+            raw, opts=TxOpts(skip_confirmation=True, preflight_commitment=commitment, max_retries=0)
+        ).value
+        pending = PendingTransaction(signature, raw, commitment, last_valid_block_height, None, ())
+        return self._track(pending)
+
+    def _send(
+        self, tx: Transaction, signers: tuple[Keypair, ...], commitment: Commitment, future: Future, bumps: int
+    ) -> Future:
+        latest = self.blockhashes.get(commitment)
+        tx.recent_blockhash = latest.blockhash
+        if self.fees is not None:
+            self.fees.apply(tx, bumps)
+        if self.compute_units is not None:
+            self.compute_units.apply(tx)
+        tx.sign(*signers)
+        raw = tx.serialize()
+        for attempt in range(1, self.send_attempts + 1):
+            try:
+                signature = self.client.send_raw_transaction(
+                    raw,
+                    opts=TxOpts(skip_confirmation=True, preflight_commitment=commitment, max_retries=0),
+                ).value
+                break
+            except Exception as e:
+                if attempt == self.send_attempts or classify(e) != RETRYABLE:
+                    raise
+                time.sleep(self.retry_backoff * attempt)
+                if transaction_error(e) in RETRYABLE_TRANSACTION_ERRORS:
+                    latest = self.blockhashes.refresh(commitment)
+                    tx.recent_blockhash = latest.blockhash
+                    tx.sign(*signers)
+                    raw = tx.serialize()
+        pending = PendingTransaction(
+            signature=signature,
+            raw=raw,
+            commitment=commitment,
+            last_valid_block_height=latest.last_valid_block_height,
+            tx=tx,
+            signers=signers,
+            future=future,
+            bumps=bumps,
+        )
+        return self._track(pending)
+
+    def _send_or_fail(
+        self, tx: Transaction, signers: tuple[Keypair, ...], commitment: Commitment, future: Future, bumps: int
+    ):
+        try:
+            self._send(tx, signers, commitment, future, bumps)
+        except Exception as e:
+            future.set_exception(e)
+
+    def _track(self, pending: PendingTransaction) -> Future:
+        if self.ledger is not None:
+            self.ledger.record_sent(str(pending.signature))
+        with self._lock:
+            idle = not self._pending
+            pending = self._pending.setdefault(pending.signature, pending)
+            self._ensure_running()
+        if self.subscriber is not None:
+            self.subscriber.subscribe(pending.signature, pending.commitment)
+        if idle:
+            self._wakeup.set()
+        return pending.future
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._closed = True
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.subscriber is not None:
+            self.subscriber.close()
+        self.blockhashes.close()
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="confirmation-engine", daemon=True)
+            self._thread.start()
+
+    def _on_notification(self, signature: Signature, err: object):
+        with self._lock:
+            item = self._pending.get(signature)
+        if item is not None:
+            if err:
+                self._fail(item, err)
+            else:
+                self._resolve(item, str(signature))
+
+    def _run(self):
+        failures = 0
+        polled_at = 0.0
+        while not self._closed:
+            subscribed = self.subscriber is not None and self.subscriber.connected.is_set()
+            interval = self.subscribed_poll_interval if subscribed else self.poll_interval
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            if self._stop.wait(polled_at + interval - time.monotonic()):
+                break
+            polled_at = time.monotonic()
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                continue
+            try:
+                self._poll(pending)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures >= self.max_poll_failures:
+                    self._fail_pending(pending, e)
+                    failures = 0
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for item in pending:
+            item.future.cancel()
+
+    def _fail_pending(self, pending: list[PendingTransaction], error: Exception):
+        for item in pending:
+            with self._lock:
+                if self._pending.pop(item.signature, None) is None:
+                    continue
+            if self.subscriber is not None:
+                self.subscriber.forget(item.signature)
+            item.future.set_exception(error)
+
+    def _fail(self, item: PendingTransaction, err: object):
+        with self._lock:
+            if self._pending.pop(item.signature, None) is None:
+                return
+        try:
+            self._executor.submit(self._settle_failed, item, err)
+        except RuntimeError:
+            self._settle(item, TransactionFailedError(item.signature, err))
+
+    def _settle_failed(self, item: PendingTransaction, err: object):
+        self._settle(item, TransactionFailedError(item.signature, err, self._logs(item.signature)))
+
+    def _logs(self, signature: Signature) -> list[str] | None:
+        try:
+            response = self.client.get_transaction(signature, commitment=Confirmed, max_supported_transaction_version=0)
+        except Exception:
+            return None
+        if response.value is None or response.value.transaction.meta is None:
+            return None
+        return response.value.transaction.meta.log_messages
+
+    def _poll(self, pending: list[PendingTransaction]):
+        block_height, statuses = get_block_height_and_statuses(
+            self.client, Finalized, [item.signature for item in pending], MAX_SIGNATURES_PER_REQUEST
+        )
+        for item, status in zip(pending, statuses, strict=True):
+            self._update(item, status, block_height)
+
+    def _update(self, item: PendingTransaction, status, block_height: int):
+        if status is not None:
+            item.seen = True
+            confirmation_status = status.confirmation_status
+            if confirmation_status is not None:
+                if int(confirmation_status) >= int(_COMMITMENT_TO_SOLDERS[item.commitment]):
+                    if status.err is not None:
+                        self._fail(item, status.err)
+                    else:
+                        self._resolve(item, str(item.signature))
+                    return
+        if block_height >= item.last_valid_block_height:
+            if item.tx is not None and self.fees is not None and item.bumps < self.fees.max_bumps:
+                self._resend_with_bump(item)
+            else:
+                self._resolve(item, TransactionExpiredError(item.signature))
+            return
+        if not item.seen and time.monotonic() - item.last_sent_at >= self.resend_interval:
+            item.last_sent_at = time.monotonic()
+            try:
+                self.client.send_raw_transaction(
+                    item.raw,
+                    opts=TxOpts(skip_confirmation=True, skip_preflight=True, max_retries=0),
+                )
+            except Exception:
+                pass
+
+    def _resend_with_bump(self, item: PendingTransaction):
+        with self._lock:
+            if self._pending.pop(item.signature, None) is None:
+                return
+        if self.subscriber is not None:
+            self.subscriber.forget(item.signature)
+        if self.ledger is not None:
+            self.ledger.record_status(str(item.signature), EXPIRED)
+        try:
+            self._executor.submit(
+                self._send_or_fail, item.tx, item.signers, item.commitment, item.future, item.bumps + 1
+            )
+        except RuntimeError as e:
+            item.future.set_exception(e)
+
+    def _resolve(self, item: PendingTransaction, result: str | Exception):
+        with self._lock:
+            if self._pending.pop(item.signature, None) is None:
+                return
+        self._settle(item, result)
+
+    def _settle(self, item: PendingTransaction, result: str | Exception):
+        if self.subscriber is not None:
+            self.subscriber.forget(item.signature)
+        if self.ledger is not None:
+            if isinstance(result, TransactionExpiredError):
+                self.ledger.record_status(str(item.signature), EXPIRED)
+            elif isinstance(result, Exception):
+                self.ledger.record_status(str(item.signature), FAILED, str(result))
+            else:
+                self.ledger.record_status(result, str(item.commitment))
+        if isinstance(result, Exception):
+            item.future.set_exception(result)
+        else:
+            item.future.set_result(result)
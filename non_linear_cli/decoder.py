@@ -0,0 +1,161 @@
+import struct
+import typing
+from collections.abc import Sequence
+
+from anchorpy.borsh_extension import BorshPubkeyAdapter
+from borsh_construct import CStruct
+from construct import Array, Flag, FormatField, Prefixed
+from solders.pubkey import Pubkey
+
+from .client.types import Contract, StreamContract
+
+PUBKEY_SIZE = 32
+PADDING_LENGTH = struct.Struct("<I")
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+def _numpy(feature: str = "Bulk decoding") -> typing.Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(f"{feature} requires numpy, install it with `poetry install -E numpy`") from None
+    return numpy
+
+
+def _compile(subcons: Sequence, account_cls: type, position: int = 0) -> tuple[str, list, int]:
+    hints = typing.get_type_hints(account_cls)
+    fmt = ""
+    plan: list = []
+    for subcon in subcons:
+        inner = subcon.subcon
+        if isinstance(inner, FormatField):
+            fmt += inner.fmtstr[1:]
+            plan.append((subcon.name, position, None))
+            position += 1
+        elif inner is Flag:
+            fmt += "?"
+            plan.append((subcon.name, position, None))
+            position += 1
+        elif isinstance(inner, BorshPubkeyAdapter):
+            fmt += f"{PUBKEY_SIZE}s"
+            plan.append((subcon.name, position, Pubkey.from_bytes))
+            position += 1
+        elif isinstance(inner, Array) and isinstance(inner.subcon, FormatField) and isinstance(inner.count, int):
+            fmt += f"{inner.count}{inner.subcon.fmtstr[1:]}"
+            plan.append((subcon.name, slice(position, position + inner.count), list))
+            position += inner.count
+        elif isinstance(inner, CStruct):
+            nested_cls = hints[subcon.name]
+            nested_fmt, nested_plan, position = _compile(inner.subcons, nested_cls, position)
+            fmt += nested_fmt
+            plan.append((subcon.name, None, (nested_cls, nested_plan)))
+        else:
+            raise TypeError(f"Unsupported field {subcon.name}")
+    return fmt, plan, position
+
+
+def _build(plan: list, values: tuple) -> dict[str, typing.Any]:
+    kwargs = {}
+    for name, index, converter in plan:
+        if converter is None:
+            kwargs[name] = values[index]
+        elif isinstance(converter, tuple):
+            nested_cls, nested_plan = converter
+            kwargs[name] = nested_cls(**_build(nested_plan, values))
+        else:
+            kwargs[name] = converter(values[index])
+    return kwargs
+
+
+def _numpy_dtype(fmtstr: str) -> str:
+    code = fmtstr[-1]
+    kind = "f" if code in "efd" else "u" if code.isupper() else "i"
+    return f"<{kind}{struct.calcsize(fmtstr)}"
+
+
+def _dtype_fields(subcons: Sequence) -> list:
+    np = _numpy()
+    fields: list = []
+    for subcon in subcons:
+        inner = subcon.subcon
+        if isinstance(inner, FormatField):
+            fields.append((subcon.name, _numpy_dtype(inner.fmtstr)))
+        elif inner is Flag:
+            fields.append((subcon.name, np.bool_))
+        elif isinstance(inner, BorshPubkeyAdapter):
+            fields.append((subcon.name, np.uint8, (PUBKEY_SIZE,)))
+        elif isinstance(inner, Array) and isinstance(inner.subcon, FormatField) and isinstance(inner.count, int):
+            fields.append((subcon.name, _numpy_dtype(inner.subcon.fmtstr), (inner.count,)))
+        elif isinstance(inner, CStruct):
+            fields.append((subcon.name, _dtype_fields(inner.subcons)))
+        else:
+            raise TypeError(f"Unsupported field {subcon.name}")
+    return fields
+
+
+class FixedOffsetDecoder:
+    def __init__(self, account_cls: type[Contract] | type[StreamContract]):
+        subcons: Sequence[typing.Any] = account_cls.layout.subcons
+        split = next(i for i, subcon in enumerate(subcons) if isinstance(subcon.subcon, Prefixed))
+        self.account_cls = account_cls
+        self.head_subcons = subcons[:split]
+        self.tail_subcons = subcons[split + 1 :]
+        self.padding_name = subcons[split].name
+        head_fmt, self.head_plan, _ = _compile(self.head_subcons, account_cls)
+        tail_fmt, self.tail_plan, _ = _compile(self.tail_subcons, account_cls)
+        self.head = struct.Struct("<" + head_fmt)
+        self.tail = struct.Struct("<" + tail_fmt)
+        self.offsets: dict[str, tuple[int, struct.Struct]] = {}
+        offset = 0
+        for subcon in self.head_subcons:
+            if subcon.subcon is Flag or isinstance(subcon.subcon, FormatField | BorshPubkeyAdapter):
+                field_fmt, _, _ = _compile([subcon], account_cls)
+                self.offsets[subcon.name] = (offset, struct.Struct("<" + field_fmt))
+            offset += subcon.sizeof()
+
+    def decode(self, data: bytes | memoryview) -> typing.Any:
+        view = memoryview(data)
+        kwargs = _build(self.head_plan, self.head.unpack_from(view, 0))
+        (padding_length,) = PADDING_LENGTH.unpack_from(view, self.head.size)
+        padding_start = self.head.size + PADDING_LENGTH.size
+        padding_end = padding_start + padding_length
+        kwargs[self.padding_name] = bytes(view[padding_start:padding_end])
+        kwargs.update(_build(self.tail_plan, self.tail.unpack_from(view, padding_end)))
+        return self.account_cls(**kwargs)
+
+    def read(self, data: bytes | memoryview, name: str) -> typing.Any:
+        offset, field = self.offsets[name]
+        (value,) = field.unpack_from(data, offset)
+        if isinstance(value, bytes):
+            return Pubkey.from_bytes(value)
+        return value
+
+    def decode_columns(self, buffers: Sequence[bytes | memoryview]) -> dict[str, "np.ndarray"]:
+        np = _numpy()
+        padding_lengths = {PADDING_LENGTH.unpack_from(buffer, self.head.size)[0] for buffer in buffers}
+        if len(padding_lengths) > 1:
+            raise ValueError("All accounts must have the same padding length to be decoded in bulk")
+        padding_length = padding_lengths.pop() if padding_lengths else 0
+        dtype = np.dtype(
+            _dtype_fields(self.head_subcons)
+            + [("_padding_length", "<u4"), ("_padding", f"V{padding_length}")]
+            + _dtype_fields(self.tail_subcons)
+        )
+        data = b"".join(memoryview(buffer)[: dtype.itemsize] for buffer in buffers)
+        records = np.frombuffer(data, dtype=dtype)
+        columns = {}
+        for name in dtype.names:
+            if name.startswith("_"):
+                continue
+            if dtype[name].names:
+                for nested_name in dtype[name].names:
+                    columns[f"{name}.{nested_name}"] = np.ascontiguousarray(records[name][nested_name])
+            else:
+                columns[name] = np.ascontiguousarray(records[name])
+        return columns
+
+
+contract_decoder = FixedOffsetDecoder(Contract)
+stream_contract_decoder = FixedOffsetDecoder(StreamContract)
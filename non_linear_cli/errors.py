@@ -0,0 +1,91 @@
+import re
+
+import httpx
+from solana.exceptions import SolanaRpcException
+from solana.rpc.core import RPCException
+from solders.pubkey import Pubkey
+from solders.rpc.errors import NodeUnhealthyMessage, SendTransactionPreflightFailureMessage
+from solders.transaction_status import (
+    InstructionErrorCustom,
+    TransactionErrorFieldless,
+    TransactionErrorInstructionError,
+)
+
+RETRYABLE = "retryable"
+PERMANENT = "permanent"
+DONE = "done"
+RETRYABLE_TRANSACTION_ERRORS = (TransactionErrorFieldless.BlockhashNotFound, "BlockhashNotFound")
+PERMANENT_ERRORS = frozenset({"InvalidIncreaseRate", "PeriodTooShort", "Unauthorized", "MintMismatch"})
+DONE_ERRORS = frozenset({"AmountAlreadyUpdated", "AllFundsUnlocked"})
+FAILED_PROGRAM_LOG = re.compile(r"Program (\w+) failed: custom program error")
+
+
+def transaction_error(error: BaseException) -> object | None:
+    if isinstance(error, RPCException) and isinstance(error.args[0], SendTransactionPreflightFailureMessage):
+        return error.args[0].data.err
+    return getattr(error, "err", None)
+
+
+def instruction_index(err: object) -> int | None:
+    if isinstance(err, TransactionErrorInstructionError):
+        return err.index
+    if isinstance(err, dict) and isinstance(err.get("InstructionError"), list):
+        return err["InstructionError"][0]
+    return None
+
+
+def failed_program(logs: list[str] | None) -> Pubkey | None:
+    for line in logs or []:
+        match = FAILED_PROGRAM_LOG.search(line)
+        if match:
+            return Pubkey.from_string(match.group(1))
+    return None
+
+
+def error_program(error: BaseException) -> Pubkey | None:
+    if isinstance(error, RPCException) and isinstance(error.args[0], SendTransactionPreflightFailureMessage):
+        return failed_program(error.args[0].data.logs)
+    return failed_program(getattr(error, "logs", None))
+
+
+def custom_error_code(err: object) -> int | None:
+    if isinstance(err, TransactionErrorInstructionError) and isinstance(err.err, InstructionErrorCustom):
+        return err.err.code
+    if isinstance(err, dict) and isinstance(err.get("InstructionError"), list):
+        inner = err["InstructionError"][1]
+        if isinstance(inner, dict) and isinstance(inner.get("Custom"), int):
+            return inner["Custom"]
+    return None
+
+
+def program_error(error: BaseException, program: Pubkey | None):
+    from .client.errors import from_code
+
+    code = custom_error_code(transaction_error(error))
+    if code is None or program is None or error_program(error) != program:
+        return None
+    return from_code(code)
+
+
+def classify(error: BaseException, program: Pubkey | None = None) -> str | None:
+    if isinstance(error, (SolanaRpcException, httpx.HTTPError)):
+        return RETRYABLE
+    if isinstance(error, RPCException) and isinstance(error.args[0], NodeUnhealthyMessage):
+        return RETRYABLE
+    if transaction_error(error) in RETRYABLE_TRANSACTION_ERRORS:
+        return RETRYABLE
+    decoded = program_error(error, program)
+    if decoded is None:
+        return None
+    if decoded.name in PERMANENT_ERRORS:
+        return PERMANENT
+    if decoded.name in DONE_ERRORS:
+        return DONE
+    return None
+
+
+def describe(error: BaseException, program: Pubkey | None) -> str:
+    decoded = program_error(error, program)
+    if decoded is not None:
+        return f"{decoded.name}: {decoded.msg}"
+    return str(error) or error.__class__.__name__
@@ -0,0 +1,92 @@
+import math
+import threading
+import time
+
+from solana.transaction import Transaction
+from solders.compute_budget import set_compute_unit_price
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+
+from .compute import COMPUTE_BUDGET_PROGRAM_ID
+from .rpc import PooledClient
+
+SET_COMPUTE_UNIT_PRICE = 3
+DEFAULT_PERCENTILE = 75
+MAX_FEE_ACCOUNTS = 128
+MAX_SEEN_ACCOUNTS = 65_536
+FEE_CACHE_TTL = 10.0
+FEE_BUMP = 1.5
+BUMP_BASE_PRICE = 1_000
+MAX_FEE_BUMPS = 3
+
+
+def is_compute_unit_price(ix: Instruction) -> bool:
+    return ix.program_id == COMPUTE_BUDGET_PROGRAM_ID and ix.data[:1] == bytes([SET_COMPUTE_UNIT_PRICE])
+
+
+def writable_accounts(instructions: list[Instruction]) -> list[Pubkey]:
+    accounts = dict.fromkeys(
+        meta.pubkey for ix in instructions for meta in ix.accounts if meta.is_writable and not meta.is_signer
+    )
+    return sorted(accounts, key=bytes)[:MAX_FEE_ACCOUNTS]
+
+
+def percentile(values: list[int], percent: float) -> int:
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+class PriorityFeeEstimator:
+    def __init__(
+        self,
+        client: PooledClient,
+        percent: float = DEFAULT_PERCENTILE,
+        floor: int = 0,
+        cap: int = 1_000_000,
+        ttl: float = FEE_CACHE_TTL,
+        max_bumps: int = MAX_FEE_BUMPS,
+    ):
+        self.client = client
+        self.percent = percent
+        self.floor = floor
+        self.cap = cap
+        self.ttl = ttl
+        self.max_bumps = max_bumps
+        self._estimates: dict[tuple, tuple[int, float]] = {}
+        self._seen: set[Pubkey] = set()
+        self._lock = threading.Lock()
+
+    def estimate(self, key: tuple, accounts: list[Pubkey]) -> int:
+        with self._lock:
+            cached = self._estimates.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        try:
+            fees = self.client.raw_request("getRecentPrioritizationFees", [[str(account) for account in accounts]])
+        except Exception:
+            return cached[0] if cached is not None else self.floor
+        price = percentile([fee["prioritizationFee"] for fee in fees], self.percent)
+        with self._lock:
+            self._estimates[key] = (price, time.monotonic())
+        return price
+
+    def shared_accounts(self, accounts: list[Pubkey]) -> tuple[Pubkey, ...]:
+        with self._lock:
+            shared = tuple(account for account in accounts if account in self._seen)
+            if len(self._seen) + len(accounts) > MAX_SEEN_ACCOUNTS:
+                self._seen.clear()
+            self._seen.update(accounts)
+        return shared
+
+    def price(self, instructions: list[Instruction], bumps: int = 0) -> int:
+        accounts = writable_accounts(instructions)
+        price = self.estimate(self.shared_accounts(accounts), accounts)
+        if bumps:
+            price = math.ceil(max(price, BUMP_BASE_PRICE) * FEE_BUMP**bumps)
+        return min(max(price, self.floor), self.cap)
+
+    def apply(self, tx: Transaction, bumps: int = 0):
+        instructions = [ix for ix in tx.instructions if not is_compute_unit_price(ix)]
+        tx.instructions = [set_compute_unit_price(self.price(instructions, bumps)), *instructions]
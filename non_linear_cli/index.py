@@ -0,0 +1,86 @@
+import sqlite3
+import time
+from collections.abc import Iterable
+
+from solders.pubkey import Pubkey
+
+from .client.types import Contract, StreamContract
+from .decoder import contract_decoder, stream_contract_decoder
+
+TABLES = {"contracts": Contract, "streams": StreamContract}
+DECODERS = {"contracts": contract_decoder, "streams": stream_contract_decoder}
+
+
+class AccountIndex:
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        for table in TABLES:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "pubkey TEXT PRIMARY KEY, sender TEXT NOT NULL, recipient TEXT NOT NULL, mint TEXT NOT NULL, "
+                "data BLOB NOT NULL, indexed_at INTEGER NOT NULL)"
+            )
+            for column in ("sender", "recipient", "mint"):
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def _upsert(self, table: str, accounts: Iterable[tuple[Pubkey, Contract | StreamContract]], prune: bool) -> int:
+        layout = TABLES[table].layout
+        indexed_at = int(time.time())
+        rows = [
+            (
+                str(pubkey),
+                str(account.sender),
+                str(account.recipient),
+                str(account.mint),
+                layout.build(account.to_encodable()),
+                indexed_at,
+            )
+            for pubkey, account in accounts
+        ]
+        with self.connection:
+            self.connection.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if prune:
+                self.connection.execute(f"DELETE FROM {table} WHERE indexed_at < ?", (indexed_at,))
+        return len(rows)
+
+    def _query(
+        self,
+        table: str,
+        sender: Pubkey | None = None,
+        recipient: Pubkey | None = None,
+        mint: Pubkey | None = None,
+    ) -> list[tuple[Pubkey, Contract | StreamContract]]:
+        decoder = DECODERS[table]
+        conditions = []
+        params = []
+        for column, value in (("sender", sender), ("recipient", recipient), ("mint", mint)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        query = f"SELECT pubkey, data FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return [
+            (Pubkey.from_string(pubkey), decoder.decode(data))
+            for pubkey, data in self.connection.execute(query, params)
+        ]
+
+    def upsert_contracts(self, contracts: Iterable[tuple[Pubkey, Contract]], prune: bool = False) -> int:
+        return self._upsert("contracts", contracts, prune)
+
+    def upsert_streams(self, streams: Iterable[tuple[Pubkey, StreamContract]], prune: bool = False) -> int:
+        return self._upsert("streams", streams, prune)
+
+    def contracts(
+        self, sender: Pubkey | None = None, recipient: Pubkey | None = None, mint: Pubkey | None = None
+    ) -> list[tuple[Pubkey, Contract]]:
+        return self._query("contracts", sender, recipient, mint)
+
+    def streams(
+        self, sender: Pubkey | None = None, recipient: Pubkey | None = None, mint: Pubkey | None = None
+    ) -> list[tuple[Pubkey, StreamContract]]:
+        return self._query("streams", sender, recipient, mint)
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+JOURNAL_SYNC_INTERVAL = 1.0
+
+
+@dataclass
+class JournalEntry:
+    row: int
+    recipient: str
+    keypair: Keypair
+    result: list[str] | None = None
+
+
+def read_journal(path: str) -> dict[int, JournalEntry]:
+    entries: dict[int, JournalEntry] = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path) as r:
+        for line in r:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "keypair" in record:
+                entries[record["row"]] = JournalEntry(
+                    record["row"], record["recipient"], Keypair.from_base58_string(record["keypair"])
+                )
+            elif record["row"] in entries:
+                entries[record["row"]].result = record["result"]
+    return entries
+
+
+class Journal:
+    def __init__(self, path: str, sync_interval: float = JOURNAL_SYNC_INTERVAL):
+        self.entries = read_journal(path)
+        self.sync_interval = sync_interval
+        torn = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as r:
+                r.seek(-1, os.SEEK_END)
+                torn = r.read(1) != b"\n"
+        self._file = open(path, "a")
+        if torn:
+            self._file.write("\n")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._synced_at = time.monotonic()
+
+    def close(self) -> None:
+        self.sync()
+        self._file.close()
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._dirty = True
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self._synced_at = time.monotonic()
+
+    def keypair(self, row: int, recipient: Pubkey, keypair: Keypair | None = None) -> Keypair:
+        entry = self.entries.get(row)
+        if entry is not None:
+            return entry.keypair
+        keypair = keypair or Keypair()
+        self.entries[row] = JournalEntry(row, str(recipient), keypair)
+        self._append({"row": row, "recipient": str(recipient), "keypair": str(keypair)})
+        return keypair
+
+    def record_result(self, result: list[str]) -> None:
+        entry = self.entries.get(int(result[0]))
+        if entry is None or entry.result == result:
+            return
+        entry.result = result
+        self._append({"row": entry.row, "result": result})
+
+    def completed(self, row: int) -> list[str] | None:
+        entry = self.entries.get(row)
+        if entry is None or entry.result is None or entry.result[-1]:
+            return None
+        return entry.result
+
+    def in_flight(self) -> list[JournalEntry]:
+        return [entry for entry in self.entries.values() if entry.result is None or entry.result[-1]]
@@ -0,0 +1,88 @@
+import heapq
+from collections.abc import Collection
+
+from solders.pubkey import Pubkey
+
+from .client.types import Contract
+
+
+def next_release_time(contract: Contract) -> int | None:
+    period = contract.ix.period
+    if contract.stream_canceled_at or not period:
+        return None
+    start_time = contract.ix.start_time
+    last_update = contract.last_release_update_time or start_time
+    if start_time and last_update >= start_time:
+        due = start_time + ((last_update - start_time) // period + 1) * period
+    else:
+        due = last_update + period
+    if contract.end_time and due >= contract.end_time:
+        return None
+    return due
+
+
+class ReleaseScheduler:
+    def __init__(self) -> None:
+        self._heap: list[tuple[int, bytes]] = []
+        self._due: dict[Pubkey, int] = {}
+        self.contracts: dict[Pubkey, Contract] = {}
+        self.stopped: set[Pubkey] = set()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def load(self, contracts: list[tuple[Pubkey, Contract]], exclude: Collection[Pubkey] = ()) -> None:
+        seen = set()
+        for pubkey, contract in contracts:
+            if pubkey in self.stopped:
+                continue
+            seen.add(pubkey)
+            if pubkey in exclude:
+                continue
+            self.contracts[pubkey] = contract
+            self.schedule(pubkey, next_release_time(contract))
+        for pubkey in list(self.contracts):
+            if pubkey not in seen:
+                self.contracts.pop(pubkey)
+                self._due.pop(pubkey, None)
+
+    def schedule(self, pubkey: Pubkey, due: int | None) -> None:
+        if due is None:
+            self._due.pop(pubkey, None)
+            return
+        if self._due.get(pubkey) == due:
+            return
+        self._due[pubkey] = due
+        heapq.heappush(self._heap, (due, bytes(pubkey)))
+
+    def stop(self, pubkey: Pubkey) -> None:
+        self.stopped.add(pubkey)
+        self.contracts.pop(pubkey, None)
+        self._due.pop(pubkey, None)
+
+    def next_due(self) -> int | None:
+        while self._heap:
+            due, key = self._heap[0]
+            if self._due.get(Pubkey.from_bytes(key)) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: int, limit: int) -> list[tuple[Pubkey, int]]:
+        popped: list[tuple[Pubkey, int]] = []
+        while len(popped) < limit:
+            due = self.next_due()
+            if due is None or due > now:
+                break
+            _, key = heapq.heappop(self._heap)
+            pubkey = Pubkey.from_bytes(key)
+            del self._due[pubkey]
+            popped.append((pubkey, due))
+        return popped
+
+    def advance(self, pubkey: Pubkey, updated_at: int) -> None:
+        contract = self.contracts.get(pubkey)
+        if contract is None:
+            return
+        contract.last_release_update_time = updated_at
+        self.schedule(pubkey, next_release_time(contract))
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import time
+
+from solders.pubkey import Pubkey
+
+from .client.types import CreateParams
+
+PRESIGNED = "presigned"
+PENDING = "pending"
+FAILED = "failed"
+EXPIRED = "expired"
+FINALIZED = "finalized"
+
+
+class Ledger:
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS created_streams ("
+            "stream_id TEXT PRIMARY KEY, proxy_id TEXT NOT NULL, sender TEXT NOT NULL, recipient TEXT NOT NULL, "
+            "mint TEXT NOT NULL, params BLOB NOT NULL, signature TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        for column in ("proxy_id", "sender", "recipient", "mint", "signature"):
+            self.connection.execute(
+                f"CREATE INDEX IF NOT EXISTS created_streams_{column} ON created_streams ({column})"
+            )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            "signature TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, sent_at INTEGER NOT NULL, "
+            "updated_at INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS signatures_status ON signatures (status)")
+        self.connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    def record_stream(
+        self,
+        stream_id: Pubkey,
+        proxy_id: Pubkey,
+        sender: Pubkey,
+        recipient: Pubkey,
+        mint: Pubkey,
+        params: CreateParams,
+        signature: str,
+    ) -> None:
+        row = (
+            str(stream_id),
+            str(proxy_id),
+            str(sender),
+            str(recipient),
+            str(mint),
+            CreateParams.layout.build(params.to_encodable()),
+            signature,
+            int(time.time()),
+        )
+        with self._lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO created_streams VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def record_sent(self, signature: str) -> None:
+        now = int(time.time())
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO signatures VALUES (?, ?, NULL, ?, ?) "
+                "ON CONFLICT (signature) DO UPDATE SET status = excluded.status, sent_at = excluded.sent_at, "
+                "updated_at = excluded.updated_at WHERE signatures.status = ?",
+                (signature, PENDING, now, now, PRESIGNED),
+            )
+
+    def record_status(self, signature: str, status: str, error: str | None = None) -> None:
+        now = int(time.time())
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO signatures VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (signature) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                "updated_at = excluded.updated_at",
+                (signature, status, error, now, now),
+            )
+
+    def streams(
+        self, sender: Pubkey | None = None, recipient: Pubkey | None = None, mint: Pubkey | None = None
+    ) -> list[tuple[str, ...]]:
+        conditions = [f"COALESCE(s.status, '{PENDING}') != '{PRESIGNED}'"]
+        params = []
+        for column, value in (("sender", sender), ("recipient", recipient), ("mint", mint)):
+            if value is not None:
+                conditions.append(f"c.{column} = ?")
+                params.append(str(value))
+        query = (
+            "SELECT c.stream_id, c.proxy_id, c.sender, c.recipient, c.mint, c.signature, "
+            f"COALESCE(s.status, '{PENDING}'), COALESCE(s.error, '') "
+            "FROM created_streams c LEFT JOIN signatures s ON s.signature = c.signature"
+        )
+        query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return list(self.connection.execute(query + " ORDER BY c.created_at", params))
+
+    def unsettled_signatures(self) -> list[str]:
+        query = (
+            "SELECT signature FROM signatures WHERE status NOT IN (?, ?, ?) UNION SELECT c.signature "
+            "FROM created_streams c LEFT JOIN signatures s ON s.signature = c.signature WHERE s.signature IS NULL"
+        )
+        with self._lock:
+            return [row[0] for row in self.connection.execute(query, (FINALIZED, FAILED, PRESIGNED))]
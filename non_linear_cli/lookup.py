@@ -0,0 +1,129 @@
+import struct
+from collections.abc import Sequence
+
+from solana.rpc.api import Client
+from solana.rpc.commitment import Finalized
+from solana.transaction import Transaction
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0, to_bytes_versioned
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import ID as SYS_PROGRAM_ID
+from solders.transaction import VersionedTransaction
+
+from .confirmation import ConfirmationEngine
+
+ADDRESS_LOOKUP_TABLE_PROGRAM_ID = Pubkey.from_string("AddressLookupTab1e1111111111111111111111111")
+CREATE_LOOKUP_TABLE = 0
+EXTEND_LOOKUP_TABLE = 2
+LOOKUP_TABLE_META_SIZE = 56
+MAX_EXTEND_ADDRESSES = 20
+
+
+class V0Transaction:
+    def __init__(
+        self,
+        fee_payer: Pubkey,
+        instructions: Sequence[Instruction],
+        lookup_tables: Sequence[AddressLookupTableAccount],
+        recent_blockhash: Hash | None = None,
+    ):
+        self.fee_payer = fee_payer
+        self.instructions = list(instructions)
+        self.lookup_tables = list(lookup_tables)
+        self.recent_blockhash = recent_blockhash
+        self._signed: VersionedTransaction | None = None
+
+    def message(self) -> MessageV0:
+        blockhash = self.recent_blockhash or Hash.default()
+        return MessageV0.try_compile(self.fee_payer, self.instructions, self.lookup_tables, blockhash)
+
+    def sign(self, *signers: Keypair):
+        self._signed = VersionedTransaction(self.message(), signers)
+
+    def serialize(self) -> bytes:
+        return bytes(self._signed)
+
+    def unsigned(self) -> VersionedTransaction:
+        message = self.message()
+        return VersionedTransaction.populate(message, [Signature.default()] * message.header.num_required_signatures)
+
+    def size(self) -> tuple[int, int]:
+        message = self.message()
+        lookups = sum(
+            len(lookup.writable_indexes) + len(lookup.readonly_indexes) for lookup in message.address_table_lookups
+        )
+        signatures = 64 * message.header.num_required_signatures
+        return 1 + signatures + len(to_bytes_versioned(message)), len(message.account_keys) + lookups
+
+
+def create_lookup_table(authority: Pubkey, payer: Pubkey, recent_slot: int) -> tuple[Instruction, Pubkey]:
+    table, bump = Pubkey.find_program_address(
+        [bytes(authority), recent_slot.to_bytes(8, "little")], ADDRESS_LOOKUP_TABLE_PROGRAM_ID
+    )
+    ix = Instruction(
+        program_id=ADDRESS_LOOKUP_TABLE_PROGRAM_ID,
+        data=struct.pack("<IQB", CREATE_LOOKUP_TABLE, recent_slot, bump),
+        accounts=[
+            AccountMeta(table, False, True),
+            AccountMeta(authority, True, False),
+            AccountMeta(payer, True, True),
+            AccountMeta(SYS_PROGRAM_ID, False, False),
+        ],
+    )
+    return ix, table
+
+
+def extend_lookup_table(table: Pubkey, authority: Pubkey, payer: Pubkey, addresses: Sequence[Pubkey]) -> Instruction:
+    return Instruction(
+        program_id=ADDRESS_LOOKUP_TABLE_PROGRAM_ID,
+        data=struct.pack("<IQ", EXTEND_LOOKUP_TABLE, len(addresses)) + b"".join(map(bytes, addresses)),
+        accounts=[
+            AccountMeta(table, False, True),
+            AccountMeta(authority, True, False),
+            AccountMeta(payer, True, True),
+            AccountMeta(SYS_PROGRAM_ID, False, False),
+        ],
+    )
+
+
+def decode_lookup_table(data: bytes) -> list[Pubkey]:
+    addresses = data[LOOKUP_TABLE_META_SIZE:]
+    return [Pubkey.from_bytes(addresses[i : i + 32]) for i in range(0, len(addresses) - len(addresses) % 32, 32)]
+
+
+def get_lookup_table(client: Client, table: Pubkey) -> AddressLookupTableAccount | None:
+    account = client.get_account_info(table).value
+    if account is None or account.owner != ADDRESS_LOOKUP_TABLE_PROGRAM_ID:
+        return None
+    return AddressLookupTableAccount(table, decode_lookup_table(bytes(account.data)))
+
+
+def ensure_lookup_table(
+    engine: ConfirmationEngine, authority: Keypair, addresses: Sequence[Pubkey], table: Pubkey | None = None
+) -> AddressLookupTableAccount:
+    client = engine.client
+    existing: list[Pubkey] = []
+    create: list[Instruction] = []
+    if table is None:
+        ix, table = create_lookup_table(authority.pubkey(), authority.pubkey(), client.get_slot(Finalized).value)
+        create.append(ix)
+    else:
+        lookup_table = get_lookup_table(client, table)
+        if lookup_table is None:
+            raise ValueError(f"Address lookup table {table} does not exist")
+        existing = list(lookup_table.addresses)
+    missing = [address for address in dict.fromkeys(addresses) if address not in existing]
+    extends = [
+        extend_lookup_table(
+            table, authority.pubkey(), authority.pubkey(), missing[start : start + MAX_EXTEND_ADDRESSES]
+        )
+        for start in range(0, len(missing), MAX_EXTEND_ADDRESSES)
+    ]
+    batches = [[*create, *extends[:1]], *[[ix] for ix in extends[1:]]] if create else [[ix] for ix in extends]
+    for instructions in batches:
+        engine.submit(Transaction(fee_payer=authority.pubkey(), instructions=instructions), authority).result()
+    return AddressLookupTableAccount(table, existing + missing)
@@ -1,84 +1,54 @@
-import hashlib
+from __future__ import annotations
+
+import base64
+import csv
+import itertools
+import json
 import os
 import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Any, BinaryIO, TextIO
 
 import click
-from borsh_construct import U64, CStruct
 from click import Context
-from solana.rpc.api import Client
-from solana.rpc.commitment import Commitment, Finalized
-from solana.rpc.core import _COMMITMENT_TO_SOLDERS
-from solana.rpc.types import TxOpts
-from solana.transaction import Transaction
-from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
-from solders.instruction import AccountMeta, Instruction
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solders.rpc.responses import RpcConfirmedTransactionStatusWithSignature
-from solders.signature import Signature
-from spl.token.client import Token
-from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
-from spl.token.instructions import create_associated_token_account
 
-from .client.instructions import (
-    CancelAccounts,
-    CreateAccounts,
-    CreateArgs,
-)
-from .client.instructions import (
-    cancel as cancel_instruction,
-)
-from .client.instructions import (
-    create as create_instruction,
-)
-from .client.types import CreateParams
+from .schedule import DEFAULT_MAX_PERIODS
 
-withdraw_stream_struct = CStruct(
-    "amount" / U64,
-)
+if TYPE_CHECKING:
+    from solana.rpc.api import Client
+    from solana.rpc.commitment import Commitment
+    from solana.transaction import Transaction
+    from solders.address_lookup_table_account import AddressLookupTableAccount
+
+    from .accounts import ProxyStream
+    from .client.types import CreateParams, StreamContract
+    from .confirmation import ConfirmationEngine
+    from .index import AccountIndex
+    from .journal import Journal
+    from .keeper import ReleaseScheduler
+    from .ledger import Ledger
+    from .manifest import ManifestRow
+    from .nonce import SignedTransaction
 
 NETWORKS = {True: "https://api.devnet.solana.com", False: "https://api.mainnet-beta.solana.com"}
-STREAMFLOW_TREASURY = Pubkey.from_string("5SEpbdjFK5FxwTvfsGMXVQTD2v4M2c5tyRTxhdsPkgDw")
-WITHDRAWOR = Pubkey.from_string("wdrwhnCv4pzW8beKsbPa4S2UDZrXenjg16KJdKSpb5u")
-FEE_ORACLE = Pubkey.from_string("B743wFVk2pCYhV91cn287e1xY7f1vt4gdY48hhNiuQmT")
-RATE_PRECISION = 10**9
+WITHDRAW_ALL = 18446744073709551615
+KEEPER_MAX_BACKOFF = 60.0
 
 
-def build_create_params(
-    start_time: int,
-    net_amount_deposited: int,
-    period: int,
-    amount_per_period: int,
-    name: str,
-    increase_rate: Decimal,
-    penalty_rate: Decimal,
-    is_penalized: bool,
-) -> CreateParams:
-    encoded_name = name.encode()
-    name_byte_array = bytearray(64)
-    name_byte_array[0 : len(encoded_name)] = encoded_name
-    return CreateParams(
-        start_time=start_time,
-        net_amount_deposited=net_amount_deposited,
-        period=period,
-        amount_per_period=amount_per_period,
-        cliff=0,
-        cliff_amount=0,
-        cancelable_by_sender=True,
-        cancelable_by_recipient=True,
-        automatic_withdrawal=False,
-        transferable_by_sender=False,
-        transferable_by_recipient=False,
-        can_topup=False,
-        stream_name=list(name_byte_array),
-        withdraw_frequency=0,
-        pausable=False,
-        can_update_rate=False,
-        increase_rate=int(increase_rate * RATE_PRECISION),
-        penalty_rate=int(penalty_rate * RATE_PRECISION),
-        is_penalized=is_penalized,
-    )
+class LazyObject(dict):
+    def __init__(self):
+        super().__init__()
+        self.factories: dict[str, Callable[[], Any]] = {}
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self.factories:
+            raise KeyError(key)
+        self[key] = value = self.factories.pop(key)()
+        return value
 
 
 def validate_decimal(ctx, param, value: str) -> Decimal:
@@ -95,6 +65,10 @@ def validate_pubkey(ctx, param, value: str | None) -> Pubkey:
         raise click.BadParameter("Invalid pubkey")
 
 
+def validate_pubkeys(ctx, param, value: tuple[str, ...]) -> list[Pubkey]:
+    return [validate_pubkey(ctx, param, item) for item in value]
+
+
 def validate_pubkey_optional(ctx, param, value: str | None) -> Pubkey | None:
     if value is None:
         return value
@@ -114,48 +88,55 @@ def validate_private_keys_file(ctx, param, value: str) -> Keypair:
             raise click.BadParameter("Invalid keys file")
 
 
+def validate_priority_fee(ctx, param, value: str) -> int | str:
+    mode, _, percent = value.partition(":")
+    try:
+        if mode != "auto":
+            return int(value)
+        if not percent or 0 <= float(percent) <= 100:
+            return value
+    except ValueError:
+        pass
+    raise click.BadParameter("Expected micro-lamports per CU, `auto` or `auto:<percentile>`")
+
+
 def send_and_confirm_transaction(
-    client: Client, tx: Transaction, *signers: Keypair, commitment: Commitment = Finalized
+    engine: ConfirmationEngine,
+    tx: Transaction,
+    *signers: Keypair,
+    commitment: Commitment | None = None,
+    program: Pubkey | None = None,
 ) -> str:
-    blockhash_resp = client.get_latest_blockhash(commitment)
-    recent_blockhash = client.parse_recent_blockhash(blockhash_resp)
-    block_height = client.get_block_height(commitment).value
-
-    commitment_to_use = _COMMITMENT_TO_SOLDERS[commitment]
-    commitment_rank = int(commitment_to_use)
-
-    tx_sig: Signature | None = None
-    while block_height < blockhash_resp.value.last_valid_block_height:
-        if block_height < blockhash_resp.value.last_valid_block_height:
-            resp = client.send_transaction(
-                tx,
-                *signers,
-                recent_blockhash=recent_blockhash,
-                opts=TxOpts(
-                    skip_confirmation=True, preflight_commitment=commitment, max_retries=0, skip_preflight=bool(tx_sig)
-                ),
-            )
-            tx_sig = resp.value
-
-        resp = client.get_signature_statuses([tx_sig])
-        resp_value = resp.value[0]
-        if resp_value is not None:
-            confirmation_status = resp_value.confirmation_status
-            if confirmation_status is not None:
-                confirmation_rank = int(confirmation_status)
-                if confirmation_rank >= commitment_rank:
-                    break
-        time.sleep(1)
-        block_height = client.get_block_height(commitment).value
-    else:
-        click.echo(f"Unable to confirm the transaction: {tx_sig}")
-        raise click.Abort()
-    return str(tx_sig)
+    from solana.rpc.commitment import Finalized
+
+    from .confirmation import TransactionExpiredError, TransactionFailedError
+    from .errors import DONE, PERMANENT, classify, describe
+
+    try:
+        return engine.submit(tx, *signers, commitment=commitment or Finalized).result()
+    except Exception as e:
+        if classify(e, program) not in (PERMANENT, DONE) and not isinstance(
+            e, (TransactionExpiredError, TransactionFailedError)
+        ):
+            raise
+        click.echo(describe(e, program))
+        raise click.Abort() from None
 
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option("--devnet", is_flag=True, show_default=True, default=False, help="Use devnet")
-@click.option("--rpc", help="Use non default RPC Pool")
+@click.option("--rpc", multiple=True, help="Use non default RPC Pool, repeat to spread requests over several endpoints")
+@click.option(
+    "--hedge",
+    is_flag=True,
+    default=False,
+    help="With several --rpc endpoints, repeat slow reads on the next fastest endpoint after its p95 latency",
+)
+@click.option(
+    "--ws",
+    "websocket",
+    help="Websocket RPC endpoint to confirm transactions with signatureSubscribe, `auto` derives it from the RPC url",
+)
 @click.option(
     "--program-id",
     default="strn1sS2qKxs7SgJ1xx4trPKSWdqxFim6HFG9ETXiCL",
@@ -169,23 +150,117 @@ def send_and_confirm_transaction(
 )
 @click.option(
     "--priority-fee",
-    default=0,
-    help="Priority fee used in transactions, set in micro-lamports as price per CU",
+    default="0",
+    callback=validate_priority_fee,
+    help="Priority fee used in transactions, set in micro-lamports as price per CU, "
+    "`auto[:percentile]` estimates it from recent prioritization fees of the written accounts",
+)
+@click.option(
+    "--priority-fee-floor", show_default=True, default=0, help="Lowest fee in micro-lamports with --priority-fee auto"
+)
+@click.option(
+    "--priority-fee-cap",
+    show_default=True,
+    default=1_000_000,
+    help="Highest fee in micro-lamports with --priority-fee auto, including bumps of resent expired transactions",
+)
+@click.option(
+    "--auto-compute-units",
+    is_flag=True,
+    default=False,
+    help="Simulate each transaction shape once and set its compute unit limit to the measured units plus a margin",
+)
+@click.option(
+    "--compute-unit-margin",
+    show_default=True,
+    default=0.1,
+    help="Fraction added to simulated compute units with --auto-compute-units",
+)
+@click.option(
+    "--blockhash-refresh-interval",
+    show_default=True,
+    default=5.0,
+    help="Seconds between background refreshes of the blockhash shared by all transactions",
+)
+@click.option(
+    "--ledger",
+    "ledger_path",
+    type=click.Path(dir_okay=False),
+    help="Path to a SQLite file recording created streams and the status of every transaction sent",
+)
+@click.option(
+    "--pda-cache",
+    type=click.Path(dir_okay=False),
+    help="Path to a SQLite file to persist derived program and token account addresses across runs",
 )
 @click.pass_context
 def cli(
     ctx: Context,
     devnet: bool,
-    rpc: str | None,
+    rpc: tuple[str, ...],
+    hedge: bool,
+    websocket: str | None,
     program_id: Pubkey,
     streamflow_program_id: Pubkey | None,
-    priority_fee: int,
+    priority_fee: int | str,
+    priority_fee_floor: int,
+    priority_fee_cap: int,
+    auto_compute_units: bool,
+    compute_unit_margin: float,
+    blockhash_refresh_interval: float,
+    ledger_path: str | None,
+    pda_cache: str | None,
 ):
-    ctx.ensure_object(dict)
-    if rpc:
-        ctx.obj["client"] = Client(rpc)
-    else:
-        ctx.obj["client"] = Client(NETWORKS[devnet])
+    ctx.ensure_object(LazyObject)
+    if pda_cache:
+        from .pda import derivations
+
+        derivations.open(pda_cache)
+        ctx.call_on_close(derivations.close)
+    endpoints = rpc or [NETWORKS[devnet]]
+
+    def make_client() -> Client:
+        from .rpc import PooledClient
+
+        client = PooledClient(endpoints, hedge=hedge)
+        ctx.call_on_close(client.close)
+        return client
+
+    def make_engine() -> ConfirmationEngine:
+        from .blockhash import BlockhashProvider
+        from .compute import ComputeUnitEstimator
+        from .confirmation import ConfirmationEngine
+        from .fees import DEFAULT_PERCENTILE, PriorityFeeEstimator
+        from .subscriptions import websocket_url
+
+        blockhashes = BlockhashProvider(ctx.obj["client"], refresh_interval=blockhash_refresh_interval)
+        url = websocket_url(endpoints[0]) if websocket == "auto" else websocket
+        compute_units = ComputeUnitEstimator(ctx.obj["client"], compute_unit_margin) if auto_compute_units else None
+        fees = None
+        if isinstance(priority_fee, str):
+            percent = float(priority_fee.partition(":")[2] or DEFAULT_PERCENTILE)
+            fees = PriorityFeeEstimator(ctx.obj["client"], percent, priority_fee_floor, priority_fee_cap)
+        engine = ConfirmationEngine(
+            ctx.obj["client"],
+            blockhashes,
+            websocket_url=url,
+            compute_units=compute_units,
+            fees=fees,
+            ledger=ctx.obj["ledger"],
+        )
+        ctx.call_on_close(engine.close)
+        return engine
+
+    def make_ledger() -> Ledger | None:
+        if ledger_path is None:
+            return None
+        from .ledger import Ledger
+
+        ledger = Ledger(ledger_path)
+        ctx.call_on_close(ledger.close)
+        return ledger
+
+    ctx.obj.factories.update(client=make_client, engine=make_engine, ledger=make_ledger)
     ctx.obj["program"] = program_id
     if streamflow_program_id:
         ctx.obj["streamflow_program"] = streamflow_program_id
@@ -193,65 +268,543 @@ def cli(
         ctx.obj["streamflow_program"] = Pubkey.from_string("HqDGZjaVRXJ9MGRQEw7qDc2rAr6iH1n1kAQdCZaCMfMZ")
     else:
         ctx.obj["streamflow_program"] = Pubkey.from_string("strmRqUCoQUgGUan5YhzUZa6KqdzwX5L6FpUxfmKg5m")
-    ctx.obj["compute_price"] = priority_fee
+    ctx.obj["compute_price"] = priority_fee if isinstance(priority_fee, int) else priority_fee_floor
+
+
+SCHEDULE_OPTIONS = [
+    click.option(
+        "-t",
+        "--start-time",
+        show_default=True,
+        default=0,
+        help="Start Time of the vesting, passing 0 starts vesting immediately",
+    ),
+    click.option("-n", "--net-amount", show_default=True, default=1000000, help="Total amount of tokens to vest"),
+    click.option(
+        "-p", "--period", show_default=True, default=30, help="Release period, release A amount every P seconds"
+    ),
+    click.option(
+        "-a",
+        "--amount-per-period",
+        show_default=True,
+        default=100000,
+        help="Release amount, every P seconds release A amount",
+    ),
+    click.option(
+        "-ir",
+        "--increase-rate",
+        show_default=True,
+        default=Decimal("1.5"),
+        callback=validate_decimal,
+        help="Increase rate, A amount will be increased by it every P seconds",
+    ),
+    click.option(
+        "-pr",
+        "--penalty-rate",
+        show_default=True,
+        default=Decimal("1"),
+        callback=validate_decimal,
+        help="Penalty rate, enacted when recipient withdraws between periods",
+    ),
+    click.option("--penalized", is_flag=True, show_default=True, default=False, help="Penalize for claims"),
+]
+
+
+def schedule_options(func: Callable) -> Callable:
+    for option in reversed(SCHEDULE_OPTIONS):
+        func = option(func)
+    return func
+
+
+def stream_params_options(func: Callable) -> Callable:
+    options = [
+        click.option(
+            "-m",
+            "--mint",
+            show_default=True,
+            default="Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",
+            callback=validate_pubkey,
+            help="Mint of the token to vest",
+        ),
+        *SCHEDULE_OPTIONS,
+        click.option("--name", show_default=True, default="", help="Name of a vesting stream"),
+        click.option(
+            "--key",
+            "sender",
+            show_default=True,
+            default="sender.json",
+            callback=validate_private_keys_file,
+            help="Path to the keys.json file for the stream sender or base58 encoded private key",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def manifest_defaults(
+    mint: Pubkey | None,
+    start_time: int,
+    net_amount: int,
+    period: int,
+    amount_per_period: int,
+    increase_rate: Decimal,
+    penalty_rate: Decimal,
+    penalized: bool,
+    name: str,
+) -> dict:
+    return {
+        "mint": mint,
+        "start_time": start_time,
+        "net_amount": net_amount,
+        "period": period,
+        "amount_per_period": amount_per_period,
+        "increase_rate": increase_rate,
+        "penalty_rate": penalty_rate,
+        "penalized": penalized,
+        "name": name,
+    }
 
 
 @cli.command()
 @click.argument("recipient", callback=validate_pubkey)
+@stream_params_options
+@click.pass_context
+def create(
+    ctx: Context,
+    recipient: Pubkey,
+    start_time: int,
+    net_amount: int,
+    mint: Pubkey,
+    period: int,
+    amount_per_period: int,
+    increase_rate: Decimal,
+    penalty_rate: Decimal,
+    penalized: bool,
+    name: str,
+    sender: Keypair,
+):
+    from .transactions import (
+        STREAMFLOW_TREASURY,
+        build_create_params,
+        build_create_transaction,
+        get_missing_token_account_owners,
+    )
+
+    click.echo(f"Sender: {sender.pubkey()}")
+    stream_signer = Keypair()
+    stream_metadata = stream_signer.pubkey()
+    params = build_create_params(
+        start_time, net_amount, period, amount_per_period, name, increase_rate, penalty_rate, penalized
+    )
+    engine: ConfirmationEngine = ctx.obj["engine"]
+    missing_owners = get_missing_token_account_owners(ctx.obj["client"], [STREAMFLOW_TREASURY, recipient], mint)
+    if STREAMFLOW_TREASURY in missing_owners:
+        click.echo("Initializing Treasury token account")
+    if recipient in missing_owners:
+        click.echo("Initializing Recipient token account")
+    tx, proxy_metadata = build_create_transaction(
+        ctx.obj["program"],
+        ctx.obj["streamflow_program"],
+        ctx.obj["compute_price"],
+        sender.pubkey(),
+        recipient,
+        mint,
+        stream_metadata,
+        params,
+        missing_owners,
+    )
+    tx_sig = send_and_confirm_transaction(engine, tx, stream_signer, sender, program=ctx.obj["program"])
+    record_stream(ctx, stream_metadata, proxy_metadata, sender.pubkey(), recipient, mint, params, tx_sig)
+
+    click.echo(f"Proxy Account id: {str(proxy_metadata)}")
+    click.echo(f"Vesting Stream id: {str(stream_metadata)}")
+    click.echo(f"Tx: {tx_sig}")
+
+
+def record_stream(
+    ctx: Context,
+    stream_id: Pubkey,
+    proxy_id: Pubkey,
+    sender: Pubkey,
+    recipient: Pubkey,
+    mint: Pubkey,
+    params: CreateParams,
+    signature: str,
+):
+    ledger: Ledger | None = ctx.obj["ledger"]
+    if ledger is not None:
+        ledger.record_stream(stream_id, proxy_id, sender, recipient, mint, params, signature)
+
+
+def manifest_create_params(row: ManifestRow) -> CreateParams:
+    from .transactions import build_create_params
+
+    return build_create_params(
+        row.start_time,
+        row.net_amount,
+        row.period,
+        row.amount_per_period,
+        row.name,
+        row.increase_rate,
+        row.penalty_rate,
+        row.penalized,
+    )
+
+
+def stream_keypair(journal: Journal | None, secret: bytes | None, row: ManifestRow) -> Keypair:
+    from .manifest import derive_stream_keypair
+
+    keypair = None if secret is None else derive_stream_keypair(secret, row.row_id)
+    if journal is not None:
+        return journal.keypair(row.index, row.recipient, keypair)
+    return keypair or Keypair()
+
+
+def create_row(
+    ctx: Context,
+    sender: Keypair,
+    index: int,
+    raw: dict,
+    defaults: dict,
+    initialized: set[tuple[Pubkey, Pubkey]],
+    journal: Journal | None,
+    secret: bytes | None,
+) -> list[str]:
+    from .errors import describe
+    from .manifest import parse_manifest_row
+    from .transactions import STREAMFLOW_TREASURY, build_create_transaction, get_missing_token_account_owners
+
+    try:
+        row = parse_manifest_row(index, raw, defaults)
+        owners = [owner for owner in (STREAMFLOW_TREASURY, row.recipient) if (owner, row.mint) not in initialized]
+        missing_owners = get_missing_token_account_owners(ctx.obj["client"], owners, row.mint)
+        stream_signer = stream_keypair(journal, secret, row)
+        params = manifest_create_params(row)
+        tx, proxy_metadata = build_create_transaction(
+            ctx.obj["program"],
+            ctx.obj["streamflow_program"],
+            ctx.obj["compute_price"],
+            sender.pubkey(),
+            row.recipient,
+            row.mint,
+            stream_signer.pubkey(),
+            params,
+            missing_owners,
+        )
+        if journal is not None:
+            journal.sync()
+        tx_sig = ctx.obj["engine"].submit(tx, stream_signer, sender).result()
+        initialized.update((owner, row.mint) for owner in owners)
+        record_stream(
+            ctx, stream_signer.pubkey(), proxy_metadata, sender.pubkey(), row.recipient, row.mint, params, tx_sig
+        )
+    except Exception as e:
+        return [str(index), str(raw.get("recipient", "")), "", "", "", describe(e, ctx.obj["program"])]
+    return [str(index), str(row.recipient), str(stream_signer.pubkey()), str(proxy_metadata), tx_sig, ""]
+
+
+def pending_rows(
+    rows: Iterable[tuple[int, dict]], journal: Journal | None, report: Callable[[list[list[str]]], None]
+) -> Iterator[tuple[int, dict]]:
+    for index, raw in rows:
+        completed = None if journal is None else journal.completed(index)
+        if completed is None:
+            yield index, raw
+        else:
+            report([completed])
+
+
+def uncreated_rows(
+    ctx: Context, rows: Iterable[tuple[int, dict]], secret: bytes, report: Callable[[list[list[str]]], None]
+) -> Iterator[tuple[int, dict]]:
+    from .accounts import MAX_ACCOUNTS_PER_REQUEST, get_accounts
+    from .manifest import derive_stream_keypair, require_row_id
+    from .pda import derive_many
+
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, MAX_ACCOUNTS_PER_REQUEST // 2)):
+        try:
+            row_ids = [require_row_id(index, raw) for index, raw in chunk]
+        except ValueError as e:
+            raise click.ClickException(f"{e}, --batch-secret needs an `id` or `row_id` column") from None
+        stream_ids = [derive_stream_keypair(secret, row_id).pubkey() for row_id in row_ids]
+        proxy_ids = derive_many(([bytes(stream_id)], ctx.obj["program"]) for stream_id in stream_ids)
+        accounts = get_accounts(
+            ctx.obj["client"], [key for pair in zip(stream_ids, proxy_ids, strict=True) for key in pair]
+        )
+        for (index, raw), stream_id, proxy_id, stream, proxy in zip(
+            chunk, stream_ids, proxy_ids, accounts[::2], accounts[1::2], strict=True
+        ):
+            if stream is None and proxy is None:
+                yield index, raw
+            else:
+                report([[str(index), str(raw.get("recipient", "")), str(stream_id), str(proxy_id), "", ""]])
+
+
+def open_journal(ctx: Context, journal_path: str | None, resume: bool) -> Journal | None:
+    from .journal import Journal
+
+    if journal_path is None:
+        if resume:
+            raise click.UsageError("--resume needs the --journal of the interrupted batch")
+        return None
+    journal = Journal(journal_path)
+    ctx.call_on_close(journal.close)
+    if journal.entries and not resume:
+        raise click.ClickException(f"Journal {journal_path} already has rows, pass --resume to continue it")
+    if resume:
+        checked, landed = resume_journal(ctx, journal)
+        click.echo(f"Resuming: {landed} of {checked} rows left in flight had landed", err=True)
+    return journal
+
+
+def resume_journal(ctx: Context, journal: Journal) -> tuple[int, int]:
+    from .accounts import get_accounts
+    from .pda import find_program_address
+
+    entries = journal.in_flight()
+    accounts = get_accounts(ctx.obj["client"], [entry.keypair.pubkey() for entry in entries])
+    landed = 0
+    for entry, account in zip(entries, accounts, strict=True):
+        if account is None:
+            continue
+        stream_id = entry.keypair.pubkey()
+        proxy_id = find_program_address([bytes(stream_id)], ctx.obj["program"])
+        journal.record_result([str(entry.row), entry.recipient, str(stream_id), str(proxy_id), "", ""])
+        landed += 1
+    journal.sync()
+    return len(entries), landed
+
+
+def create_packed(
+    ctx: Context,
+    sender: Keypair,
+    chunk: Iterable[tuple[int, dict]],
+    defaults: dict,
+    initialized: set[tuple[Pubkey, Pubkey]],
+    journal: Journal | None,
+    secret: bytes | None,
+    lookup_tables: list[AddressLookupTableAccount],
+) -> list[list[str]]:
+    from .errors import describe
+    from .manifest import parse_manifest_row
+    from .packing import PackItem, send_packed
+    from .transactions import (
+        STREAMFLOW_TREASURY,
+        build_create_instructions,
+        create_compute_units,
+        get_missing_token_account_owners,
+    )
+
+    results: dict[int, list[str]] = {}
+    rows = []
+    for index, raw in chunk:
+        try:
+            rows.append(parse_manifest_row(index, raw, defaults))
+        except Exception as e:
+            results[index] = [str(index), str(raw.get("recipient", "")), "", "", "", str(e)]
+    missing: set[tuple[Pubkey, Pubkey]] = set()
+    for mint in {row.mint for row in rows}:
+        owners = {STREAMFLOW_TREASURY, *(row.recipient for row in rows if row.mint == mint)}
+        owners = [owner for owner in owners if (owner, mint) not in initialized]
+        try:
+            missing.update((owner, mint) for owner in get_missing_token_account_owners(ctx.obj["client"], owners, mint))
+        except Exception as e:
+            results.update(
+                (row.index, [str(row.index), str(row.recipient), "", "", "", str(e)])
+                for row in rows
+                if row.mint == mint
+            )
+    rows = [row for row in rows if row.index not in results]
+    items = []
+    created = []
+    for row in rows:
+        owners = [owner for owner in (STREAMFLOW_TREASURY, row.recipient) if (owner, row.mint) in missing]
+        stream_signer = stream_keypair(journal, secret, row)
+        params = manifest_create_params(row)
+        instructions, proxy_metadata = build_create_instructions(
+            ctx.obj["program"],
+            ctx.obj["streamflow_program"],
+            sender.pubkey(),
+            row.recipient,
+            row.mint,
+            stream_signer.pubkey(),
+            params,
+            owners,
+        )
+        items.append(PackItem(instructions, create_compute_units(instructions), (stream_signer,)))
+        created.append((stream_signer.pubkey(), proxy_metadata, params))
+    if journal is not None:
+        journal.sync()
+    futures = send_packed(ctx.obj["engine"], items, ctx.obj["compute_price"], sender, lookup_tables=lookup_tables)
+    for row, (stream_metadata, proxy_metadata, params), future in zip(rows, created, futures, strict=True):
+        result = [str(row.index), str(row.recipient), str(stream_metadata), str(proxy_metadata)]
+        try:
+            tx_sig = future.result()
+            record_stream(
+                ctx, stream_metadata, proxy_metadata, sender.pubkey(), row.recipient, row.mint, params, tx_sig
+            )
+            results[row.index] = [*result, tx_sig, ""]
+            initialized.update(((STREAMFLOW_TREASURY, row.mint), (row.recipient, row.mint)))
+        except Exception as e:
+            results[row.index] = [*result, "", describe(e, ctx.obj["program"])]
+    return [results[index] for index in sorted(results)]
+
+
+@cli.command("create-batch")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@stream_params_options
+@click.option("-w", "--window", show_default=True, default=16, help="Maximum number of manifest rows in flight")
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write per-row results to as CSV")
 @click.option(
-    "-m",
-    "--mint",
-    show_default=True,
-    default="Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",
-    callback=validate_pubkey,
-    help="Mint of the token to vest",
+    "--v0",
+    "versioned",
+    is_flag=True,
+    default=False,
+    help="Pack several streams into each v0 transaction using an address lookup table",
 )
 @click.option(
-    "-t",
-    "--start-time",
-    show_default=True,
-    default=0,
-    help="Start Time of the vesting, passing 0 starts vesting immediately",
+    "--lookup-table",
+    callback=validate_pubkey_optional,
+    help="Existing address lookup table owned by the sender to extend and use, implies --v0",
 )
-@click.option("-n", "--net-amount", show_default=True, default=1000000, help="Total amount of tokens to vest")
-@click.option("-p", "--period", show_default=True, default=30, help="Release period, release A amount every P seconds")
 @click.option(
-    "-a",
-    "--amount-per-period",
-    show_default=True,
-    default=100000,
-    help="Release amount, every P seconds release A amount",
+    "--journal",
+    "journal_path",
+    type=click.Path(dir_okay=False),
+    help="Write-ahead journal of stream keypairs and row results, required to resume an interrupted batch",
 )
 @click.option(
-    "-ir",
-    "--increase-rate",
-    show_default=True,
-    default=Decimal("1.5"),
-    callback=validate_decimal,
-    help="Increase rate, A amount will be increased by it every P seconds",
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Continue the batch in --journal, checking rows left in flight before sending anything",
 )
 @click.option(
-    "-pr",
-    "--penalty-rate",
-    show_default=True,
-    default=Decimal("1"),
-    callback=validate_decimal,
-    help="Penalty rate, enacted when recipient withdraws between periods",
+    "--batch-secret",
+    "batch_secret",
+    type=click.File("rb"),
+    help="File with a secret to derive each stream keypair from with the row `id` or `row_id`, "
+    "rows whose stream already exists are skipped",
 )
-@click.option("--penalized", is_flag=True, show_default=True, default=False, help="Penalize for claims")
-@click.option("--name", show_default=True, default="", help="Name of a vesting stream")
+@click.pass_context
+def create_batch(
+    ctx: Context,
+    manifest: str,
+    start_time: int,
+    net_amount: int,
+    mint: Pubkey,
+    period: int,
+    amount_per_period: int,
+    increase_rate: Decimal,
+    penalty_rate: Decimal,
+    penalized: bool,
+    name: str,
+    sender: Keypair,
+    window: int,
+    output: TextIO,
+    versioned: bool,
+    lookup_table: Pubkey | None,
+    journal_path: str | None,
+    resume: bool,
+    batch_secret: BinaryIO | None,
+):
+    from .lookup import ensure_lookup_table
+    from .manifest import read_manifest
+    from .transactions import create_lookup_addresses
+
+    click.echo(f"Sender: {sender.pubkey()}", err=True)
+    engine: ConfirmationEngine = ctx.obj["engine"]
+    journal = open_journal(ctx, journal_path, resume)
+    secret = None if batch_secret is None else batch_secret.read().strip()
+    if secret == b"":
+        raise click.BadParameter("Batch secret file is empty", param_hint="--batch-secret")
+    defaults = manifest_defaults(
+        mint, start_time, net_amount, period, amount_per_period, increase_rate, penalty_rate, penalized, name
+    )
+    initialized: set[tuple[Pubkey, Pubkey]] = set()
+
+    writer = csv.writer(output)
+    writer.writerow(["row", "recipient", "stream_id", "proxy_id", "signature", "error"])
+    total = created = 0
+
+    def report(results: Iterable[list[str]]):
+        nonlocal total, created
+        for result in results:
+            total += 1
+            created += not result[-1]
+            writer.writerow(result)
+            if journal is not None:
+                journal.record_result(result)
+        output.flush()
+
+    started_at = time.monotonic()
+    rows = pending_rows(read_manifest(manifest), journal, report)
+    if secret is not None:
+        rows = uncreated_rows(ctx, rows, secret, report)
+    if versioned or lookup_table is not None:
+        addresses = create_lookup_addresses(ctx.obj["streamflow_program"], sender.pubkey(), mint)
+        lookup_tables = [ensure_lookup_table(engine, sender, addresses, lookup_table)]
+        click.echo(f"Address lookup table: {lookup_tables[0].key}", err=True)
+        while chunk := list(itertools.islice(rows, window)):
+            report(create_packed(ctx, sender, chunk, defaults, initialized, journal, secret, lookup_tables))
+    else:
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            in_flight: set[Future] = set()
+            for index, raw in rows:
+                if len(in_flight) >= window:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    report(future.result() for future in done)
+                in_flight.add(
+                    executor.submit(create_row, ctx, sender, index, raw, defaults, initialized, journal, secret)
+                )
+            report(future.result() for future in as_completed(in_flight))
+    elapsed = time.monotonic() - started_at
+    rate = created / elapsed if elapsed else 0
+    click.echo(f"Created {created} of {total} streams in {elapsed:.1f}s ({rate:.2f}/s)", err=True)
+
+
+@cli.command("create-nonce-accounts")
+@click.option("-n", "--count", required=True, type=click.IntRange(1), help="Number of nonce accounts to create")
 @click.option(
     "--key",
     "sender",
     show_default=True,
     default="sender.json",
     callback=validate_private_keys_file,
-    help="Path to the keys.json file for the stream sender or base58 encoded private key",
+    help="Path to the keys.json file paying for and authorizing the nonce accounts or base58 encoded private key",
 )
+@click.option("-o", "--output", type=click.File("a"), default="-", help="File to append nonce account addresses to")
 @click.pass_context
-def create(
+def create_nonce_accounts_command(ctx: Context, count: int, sender: Keypair, output: TextIO):
+    from .nonce import create_nonce_accounts
+
+    results = create_nonce_accounts(ctx.obj["engine"], sender, sender.pubkey(), count, ctx.obj["compute_price"])
+    for nonce_account, error in results:
+        if error is None:
+            output.write(f"{nonce_account}\n")
+        else:
+            click.echo(f"Failed to create nonce account {nonce_account}: {error}", err=True)
+    output.flush()
+    created = sum(error is None for _, error in results)
+    click.echo(f"Created {created} of {count} nonce accounts", err=True)
+
+
+@cli.command("presign-batch")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@stream_params_options
+@click.option(
+    "--nonce-accounts",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="File with a nonce account address per line, one per manifest row, authorized by the sender",
+)
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write signed transactions to as JSONL")
+@click.pass_context
+def presign_batch(
     ctx: Context,
-    recipient: Pubkey,
+    manifest: str,
     start_time: int,
     net_amount: int,
     mint: Pubkey,
@@ -262,102 +815,287 @@ def create(
     penalized: bool,
     name: str,
     sender: Keypair,
+    nonce_accounts: str,
+    output: TextIO,
 ):
-    click.echo(f"Sender: {sender.pubkey()}")
-    stream_signer = Keypair()
-    stream_metadata = stream_signer.pubkey()
-    program = ctx.obj["program"]
-    streamflow_program = ctx.obj["streamflow_program"]
-    proxy_metadata, _ = Pubkey.find_program_address([bytes(stream_metadata)], program)
-    escrow_tokens, _ = Pubkey.find_program_address([b"strm", bytes(stream_metadata)], streamflow_program)
-    proxy_tokens, _ = Pubkey.find_program_address(
-        [bytes(proxy_metadata), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    sender_tokens, _ = Pubkey.find_program_address(
-        [bytes(sender.pubkey()), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    recipient_tokens, _ = Pubkey.find_program_address(
-        [bytes(recipient), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
+    from dataclasses import asdict
+
+    from .ledger import PRESIGNED
+    from .manifest import parse_manifest_row, read_manifest
+    from .nonce import SignedTransaction, get_nonces, read_nonce_accounts, sign_with_nonce
+    from .transactions import STREAMFLOW_TREASURY, build_create_transaction, get_missing_token_account_owners
+
+    client: Client = ctx.obj["client"]
+    ledger: Ledger | None = ctx.obj["ledger"]
+    defaults = manifest_defaults(
+        mint, start_time, net_amount, period, amount_per_period, increase_rate, penalty_rate, penalized, name
     )
-    args = CreateArgs(
-        ix=build_create_params(
-            start_time, net_amount, period, amount_per_period, name, increase_rate, penalty_rate, penalized
+    rows = []
+    for index, raw in read_manifest(manifest):
+        try:
+            rows.append(parse_manifest_row(index, raw, defaults))
+        except Exception as e:
+            click.echo(f"Skipping row {index}: {e}", err=True)
+    accounts = read_nonce_accounts(nonce_accounts)
+    if len(accounts) < len(rows):
+        raise click.ClickException(
+            f"{len(rows)} rows need as many nonce accounts, {nonce_accounts} has {len(accounts)}"
         )
-    )
-    accounts = CreateAccounts(
-        sender=sender.pubkey(),
-        sender_tokens=sender_tokens,
-        recipient=recipient,
-        recipient_tokens=recipient_tokens,
-        proxy_metadata=proxy_metadata,
-        proxy_tokens=proxy_tokens,
-        stream_metadata=stream_metadata,
-        escrow_tokens=escrow_tokens,
-        withdrawor=WITHDRAWOR,
-        partner=sender.pubkey(),
-        partner_tokens=sender_tokens,
-        mint=mint,
-        fee_oracle=FEE_ORACLE,
-        streamflow_program=streamflow_program,
-    )
-    tx = Transaction(
-        fee_payer=sender.pubkey(),
-        instructions=[
-            set_compute_unit_limit(300_000),
-            set_compute_unit_price(ctx.obj["compute_price"]),
-            create_instruction(args, accounts, program),
-        ],
-    )
+    nonces = get_nonces(client, accounts)
+    uninitialized = [str(account) for account, nonce in zip(accounts, nonces, strict=True) if nonce is None]
+    if uninitialized:
+        raise click.ClickException(f"Not initialized nonce accounts: {', '.join(uninitialized)}")
+    missing: set[tuple[Pubkey, Pubkey]] = set()
+    for row_mint in {row.mint for row in rows}:
+        owners = [STREAMFLOW_TREASURY, *(row.recipient for row in rows if row.mint == row_mint)]
+        missing.update((owner, row_mint) for owner in get_missing_token_account_owners(client, owners, row_mint))
+    for row, nonce_account, nonce in zip(rows, accounts, nonces, strict=False):
+        stream_signer = Keypair()
+        params = manifest_create_params(row)
+        tx, proxy_metadata = build_create_transaction(
+            ctx.obj["program"],
+            ctx.obj["streamflow_program"],
+            ctx.obj["compute_price"],
+            sender.pubkey(),
+            row.recipient,
+            row.mint,
+            stream_signer.pubkey(),
+            params,
+            [owner for owner in (STREAMFLOW_TREASURY, row.recipient) if (owner, row.mint) in missing],
+        )
+        raw, signature = sign_with_nonce(tx, nonce_account, nonce, sender, stream_signer)
+        if ledger is not None:
+            ledger.record_status(signature, PRESIGNED)
+        record_stream(
+            ctx, stream_signer.pubkey(), proxy_metadata, sender.pubkey(), row.recipient, row.mint, params, signature
+        )
+        signed = SignedTransaction(
+            row=row.index,
+            recipient=str(row.recipient),
+            stream_id=str(stream_signer.pubkey()),
+            proxy_id=str(proxy_metadata),
+            nonce_account=str(nonce_account),
+            nonce=str(nonce),
+            signature=signature,
+            transaction=base64.b64encode(raw).decode(),
+        )
+        output.write(json.dumps(asdict(signed)) + "\n")
+    output.flush()
+    click.echo(f"Signed {len(rows)} transactions", err=True)
+
+
+@cli.command("submit-signed")
+@click.argument("signed_path", metavar="SIGNED", type=click.Path(exists=True, dir_okay=False))
+@click.option("-w", "--window", show_default=True, default=64, help="Maximum number of transactions in flight")
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write per-row results to as CSV")
+@click.pass_context
+def submit_signed(ctx: Context, signed_path: str, window: int, output: TextIO):
+    from solders.hash import Hash
+    from solders.signature import Signature
+
+    from .errors import describe
+    from .nonce import NONCE_VALID_BLOCKS, get_nonces, read_signed
+    from .rpc import get_signature_history
+
     client: Client = ctx.obj["client"]
-    token_client = Token(client, mint, TOKEN_PROGRAM_ID, sender)
-    if not token_client.get_accounts_by_owner(STREAMFLOW_TREASURY).value:
-        click.echo("Initializing Treasury token account")
-        txn = Transaction(
-            fee_payer=sender.pubkey(),
-            instructions=[
-                set_compute_unit_price(ctx.obj["compute_price"]),
-                create_associated_token_account(payer=sender.pubkey(), owner=STREAMFLOW_TREASURY, mint=mint),
-            ],
+    engine: ConfirmationEngine = ctx.obj["engine"]
+    ledger: Ledger | None = ctx.obj["ledger"]
+    signed = read_signed(signed_path)
+    nonces = get_nonces(client, [Pubkey.from_string(item.nonce_account) for item in signed])
+    stale = [item for item, nonce in zip(signed, nonces, strict=True) if nonce != Hash.from_string(item.nonce)]
+    stale_rows = {item.row for item in stale}
+    statuses = get_signature_history(client, [Signature.from_string(item.signature) for item in stale])
+    landed = {item.row: status.err for item, status in zip(stale, statuses, strict=True) if status is not None}
+
+    writer = csv.writer(output)
+    writer.writerow(["row", "recipient", "stream_id", "proxy_id", "signature", "error"])
+    total = submitted = 0
+
+    def report(item: SignedTransaction, error: str = ""):
+        nonlocal total, submitted
+        total += 1
+        submitted += not error
+        writer.writerow(
+            [item.row, item.recipient, item.stream_id, item.proxy_id, "" if error else item.signature, error]
         )
-        send_and_confirm_transaction(client, txn, sender)
-    if not token_client.get_accounts_by_owner(recipient).value:
-        click.echo("Initializing Recipient token account")
-        txn = Transaction(
-            fee_payer=sender.pubkey(),
-            instructions=[
-                set_compute_unit_price(ctx.obj["compute_price"]),
-                create_associated_token_account(payer=sender.pubkey(), owner=recipient, mint=mint),
-            ],
+        output.flush()
+
+    in_flight: dict[Future, SignedTransaction] = {}
+
+    def report_done(futures: Iterable[Future]):
+        for future in futures:
+            try:
+                future.result()
+                report(in_flight.pop(future))
+            except Exception as e:
+                report(in_flight.pop(future), describe(e, ctx.obj["program"]))
+
+    for item in signed:
+        if item.row in stale_rows:
+            err = landed.get(item.row, "Nonce advanced without this transaction, sign the row again")
+            if ledger is not None and item.row in landed:
+                ledger.record_sent(item.signature)
+            report(item, "" if err is None else str(err))
+            continue
+        if len(in_flight) >= window:
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            report_done(done)
+        try:
+            future = engine.submit_signed(base64.b64decode(item.transaction), NONCE_VALID_BLOCKS)
+        except Exception as e:
+            report(item, describe(e, ctx.obj["program"]))
+            continue
+        in_flight[future] = item
+    report_done(as_completed(list(in_flight)))
+    click.echo(f"Landed {submitted} of {total} transactions", err=True)
+
+
+@cli.command("simulate")
+@schedule_options
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="CSV or JSONL manifest in the create-batch format to simulate a stream per row",
+)
+@click.option(
+    "--withdraw-every",
+    show_default=True,
+    default=0,
+    help="Simulate the recipient withdrawing all available funds every N periods, 0 never withdraws",
+)
+@click.option("--max-periods", show_default=True, default=DEFAULT_MAX_PERIODS, help="Maximum number of periods")
+@click.option("--periods", "per_period", is_flag=True, default=False, help="Write every period instead of a summary")
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write the schedules to as CSV")
+def simulate_schedules(
+    start_time: int,
+    net_amount: int,
+    period: int,
+    amount_per_period: int,
+    increase_rate: Decimal,
+    penalty_rate: Decimal,
+    penalized: bool,
+    manifest: str | None,
+    withdraw_every: int,
+    max_periods: int,
+    per_period: bool,
+    output: TextIO,
+):
+    from .manifest import parse_manifest_row, read_manifest
+    from .schedule import simulate
+
+    if period <= 0:
+        raise click.BadParameter("Period must be greater than 0", param_hint="'-p' / '--period'")
+    defaults = manifest_defaults(
+        None, start_time, net_amount, period, amount_per_period, increase_rate, penalty_rate, penalized, ""
+    )
+    rows = []
+    for index, raw in read_manifest(manifest) if manifest else [(0, {"recipient": str(Pubkey.default())})]:
+        try:
+            row = parse_manifest_row(index, raw, defaults)
+        except Exception as e:
+            raise click.ClickException(f"Invalid manifest row {index}: {str(e) or e.__class__.__name__}") from None
+        if row.period <= 0:
+            raise click.ClickException(f"Invalid manifest row {index}: period must be greater than 0")
+        rows.append(row)
+    now = int(time.time())
+    schedules = simulate(
+        [row.start_time or now for row in rows],
+        [row.net_amount for row in rows],
+        [row.period for row in rows],
+        [row.amount_per_period for row in rows],
+        [row.increase_rate for row in rows],
+        [row.penalty_rate for row in rows],
+        [row.penalized for row in rows],
+        withdraw_every=withdraw_every,
+        max_periods=max_periods,
+    )
+    completed_periods = schedules.completed_period.tolist()
+    writer = csv.writer(output)
+    if per_period:
+        writer.writerow(["row", "period", "time", "amount", "unlocked", "withdrawn"])
+        times = schedules.period_end_times().tolist()
+        amounts = schedules.amounts.tolist()
+        unlocked = schedules.unlocked.tolist()
+        withdrawn = schedules.withdrawn.tolist()
+        for i, row in enumerate(rows):
+            last = completed_periods[i] if completed_periods[i] >= 0 else schedules.periods - 1
+            for t in range(last + 1):
+                writer.writerow([row.index, t, times[i][t], amounts[i][t], unlocked[i][t], withdrawn[i][t]])
+    else:
+        writer.writerow(["row", "periods", "end_time", "first_amount", "last_amount", "unlocked", "withdrawn"])
+        end_times = schedules.end_time().tolist()
+        for i, row in enumerate(rows):
+            completed = completed_periods[i] >= 0
+            last = completed_periods[i] if completed else schedules.periods - 1
+            writer.writerow(
+                [
+                    row.index,
+                    last + 1 if completed else "",
+                    end_times[i] if completed else "",
+                    int(schedules.amounts[i, 0]),
+                    int(schedules.amounts[i, last]),
+                    int(schedules.unlocked[i, -1]),
+                    int(schedules.withdrawn[i, -1]),
+                ]
+            )
+    incomplete = sum(1 for completed_period in completed_periods if completed_period < 0)
+    if incomplete:
+        click.echo(
+            f"{incomplete} of {len(rows)} streams are not fully unlocked after {schedules.periods} periods", err=True
         )
-        send_and_confirm_transaction(client, txn, sender)
-    tx_sig = send_and_confirm_transaction(client, tx, stream_signer, sender)
 
-    click.echo(f"Proxy Account id: {str(proxy_metadata)}")
-    click.echo(f"Vesting Stream id: {str(stream_metadata)}")
-    click.echo(f"Tx: {tx_sig}")
 
+def fetch_proxy_streams(ctx: Context, stream_ids: list[Pubkey]) -> list[ProxyStream]:
+    from .accounts import get_proxy_streams
+
+    proxy_streams = get_proxy_streams(ctx.obj["client"], ctx.obj["program"], stream_ids)
+    missing = [str(stream_id) for stream_id, found in zip(stream_ids, proxy_streams, strict=True) if found is None]
+    if missing:
+        raise click.ClickException(f"Could not find stream {', '.join(missing)}")
+    return proxy_streams
+
+
+def report_packed(stream_ids: list[Pubkey], futures: list[Future], program: Pubkey):
+    from .errors import DONE, classify, describe
+
+    failed = 0
+    for stream_id, future in zip(stream_ids, futures, strict=True):
+        prefix = f"{stream_id} " if len(stream_ids) > 1 else ""
+        try:
+            click.echo(f"{prefix}Tx: {future.result()}")
+        except Exception as e:
+            failed += classify(e, program) != DONE
+            click.echo(f"{prefix}{describe(e, program)}")
+    if failed:
+        raise click.Abort()
+
+
+def send_withdraws(ctx: Context, authority: Keypair, streams: list[tuple[Pubkey, Pubkey, StreamContract]], amount: int):
+    from .packing import PackItem, send_packed
+    from .transactions import WITHDRAW_COMPUTE_UNITS, build_withdraw_instruction
 
-def get_first_signature(client: Client, stream_id: Pubkey) -> Signature | None:
-    last_tx_sig: Signature | None = None
-    tx_signatures: list[RpcConfirmedTransactionStatusWithSignature] = []
-    while not tx_signatures or len(tx_signatures) >= 1000:
-        if tx_signatures:
-            last_tx_sig = tx_signatures[-1].signature
-        res = client.get_signatures_for_address(stream_id, before=last_tx_sig, limit=1000)
-        tx_signatures = res.value
-        if not tx_signatures:
-            return last_tx_sig
-    return tx_signatures[-1].signature
+    items = [
+        PackItem(
+            [build_withdraw_instruction(streamflow_program, stream_id, stream, authority.pubkey(), amount)],
+            WITHDRAW_COMPUTE_UNITS,
+        )
+        for streamflow_program, stream_id, stream in streams
+    ]
+    futures = send_packed(ctx.obj["engine"], items, ctx.obj["compute_price"], authority)
+    report_packed([stream_id for _, stream_id, _ in streams], futures, ctx.obj["program"])
 
 
 @cli.command()
 @click.option(
     "-s",
     "--stream-id",
-    callback=validate_pubkey,
-    help="Vesting Stream id",
+    "stream_ids",
+    multiple=True,
+    required=True,
+    callback=validate_pubkeys,
+    help="Vesting Stream id, repeat to withdraw from several streams in packed transactions",
 )
-@click.option("-a", "--amount", show_default=True, default=18446744073709551615)
+@click.option("-a", "--amount", show_default=True, default=WITHDRAW_ALL)
 @click.option(
     "--key",
     "authority",
@@ -369,68 +1107,51 @@ def get_first_signature(client: Client, stream_id: Pubkey) -> Signature | None:
 @click.pass_context
 def withdraw(
     ctx: Context,
-    stream_id: Pubkey,
+    stream_ids: list[Pubkey],
     amount: int,
     authority: Keypair,
 ):
-    client: Client = ctx.obj["client"]
+    proxy_streams = fetch_proxy_streams(ctx, stream_ids)
+    streams = [
+        (proxy_stream.streamflow_program, proxy_stream.stream_id, proxy_stream.stream) for proxy_stream in proxy_streams
+    ]
+    send_withdraws(ctx, authority, streams, amount)
+
+
+@cli.command("withdraw-all")
+@click.option(
+    "--key",
+    "authority",
+    show_default=True,
+    default="recipient.json",
+    callback=validate_private_keys_file,
+    help="Path to the keys.json file of the recipient or base58 encoded private key",
+)
+@click.option("--mint", callback=validate_pubkey_optional, help="Only streams of this mint")
+@click.pass_context
+def withdraw_all(ctx: Context, authority: Keypair, mint: Pubkey | None):
+    from .accounts import get_stream_contracts, withdrawable_amount
+
     streamflow_program = ctx.obj["streamflow_program"]
-    sig = get_first_signature(client, stream_id)
-    if not sig:
-        raise click.ClickException(f"Could not find initial tx for stream {str(stream_id)}")
-    tx = client.get_transaction(sig).value.transaction.transaction
-    accounts = list(tx.message.instructions[-1].accounts)
-    account_keys = list(tx.message.account_keys)
-    sender = account_keys[accounts[0]]
-    recipient = account_keys[accounts[2]]
-    mint = account_keys[accounts[11]]
-    stream_id = account_keys[accounts[6]]
-    escrow_tokens, _ = Pubkey.find_program_address([b"strm", bytes(stream_id)], streamflow_program)
-    sender_tokens, _ = Pubkey.find_program_address(
-        [bytes(sender), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    recipient_tokens, _ = Pubkey.find_program_address(
-        [bytes(recipient), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    streamflow_treasury_tokens, _ = Pubkey.find_program_address(
-        [bytes(STREAMFLOW_TREASURY), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    args = withdraw_stream_struct.build({"amount": amount})
-    ix_id = hashlib.sha256(b"global:withdraw").digest()[:8]
-    ix = Instruction(
-        program_id=streamflow_program,
-        data=bytes(ix_id) + bytes(args) + bytes(10),
-        accounts=[
-            AccountMeta(authority.pubkey(), True, True),
-            AccountMeta(recipient, False, True),
-            AccountMeta(recipient_tokens, False, True),
-            AccountMeta(stream_id, False, True),
-            AccountMeta(escrow_tokens, False, True),
-            AccountMeta(STREAMFLOW_TREASURY, False, True),
-            AccountMeta(streamflow_treasury_tokens, False, True),
-            AccountMeta(sender, False, True),
-            AccountMeta(sender_tokens, False, True),
-            AccountMeta(mint, False, False),
-            AccountMeta(TOKEN_PROGRAM_ID, False, False),
-        ],
-    )
-    tx = Transaction(
-        fee_payer=authority.pubkey(),
-        instructions=[
-            set_compute_unit_price(ctx.obj["compute_price"]),
-            ix,
-        ],
-    )
-    tx_sig = send_and_confirm_transaction(client, tx, authority)
-    click.echo(f"Tx: {tx_sig}")
+    streams = get_stream_contracts(ctx.obj["client"], streamflow_program, recipient=authority.pubkey(), mint=mint)
+    now = int(time.time())
+    due = [
+        (streamflow_program, stream_id, stream) for stream_id, stream in streams if withdrawable_amount(stream, now) > 0
+    ]
+    click.echo(f"Withdrawing from {len(due)} of {len(streams)} streams")
+    if due:
+        send_withdraws(ctx, authority, due, WITHDRAW_ALL)
 
 
 @cli.command()
 @click.option(
     "-s",
     "--stream-id",
-    callback=validate_pubkey,
-    help="Vesting Stream id",
+    "stream_ids",
+    multiple=True,
+    required=True,
+    callback=validate_pubkeys,
+    help="Vesting Stream id, repeat to cancel several streams in packed transactions",
 )
 @click.option(
     "--key",
@@ -443,67 +1164,369 @@ def withdraw(
 @click.pass_context
 def cancel(
     ctx: Context,
-    stream_id: Pubkey,
+    stream_ids: list[Pubkey],
+    authority: Keypair,
+):
+    from .packing import PackItem, send_packed
+    from .transactions import CANCEL_COMPUTE_UNITS, build_cancel_instruction
+
+    program = ctx.obj["program"]
+    proxy_streams = fetch_proxy_streams(ctx, stream_ids)
+    unmanaged = [str(proxy_stream.stream_id) for proxy_stream in proxy_streams if proxy_stream.proxy is None]
+    if unmanaged:
+        raise click.ClickException(f"Stream {', '.join(unmanaged)} is not managed by proxy program {str(program)}")
+    items = [
+        PackItem([build_cancel_instruction(program, proxy_stream, authority.pubkey())], CANCEL_COMPUTE_UNITS)
+        for proxy_stream in proxy_streams
+    ]
+    futures = send_packed(ctx.obj["engine"], items, ctx.obj["compute_price"], authority)
+    report_packed(stream_ids, futures, ctx.obj["program"])
+
+
+@cli.command("cancel-batch")
+@click.option(
+    "-s",
+    "--stream-id",
+    "stream_ids",
+    multiple=True,
+    callback=validate_pubkeys,
+    help="Vesting Stream id to cancel, can be repeated",
+)
+@click.option(
+    "--ids",
+    "ids_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="File with a Vesting Stream id per line to cancel",
+)
+@click.option("--sender", callback=validate_pubkey_optional, help="Cancel every open proxy stream of this sender")
+@click.option("--mint", callback=validate_pubkey_optional, help="Cancel every open proxy stream of this mint")
+@click.option(
+    "--key",
+    "authority",
+    show_default=True,
+    default="sender.json",
+    callback=validate_private_keys_file,
+    help="Path to the keys.json file for cancel authority or base58 encoded private key",
+)
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write per-stream results to as CSV")
+@click.pass_context
+def cancel_batch(
+    ctx: Context,
+    stream_ids: list[Pubkey],
+    ids_path: str | None,
+    sender: Pubkey | None,
+    mint: Pubkey | None,
     authority: Keypair,
+    output: TextIO,
 ):
+    from .accounts import get_contracts, get_proxy_streams
+    from .errors import describe
+    from .packing import PackItem, send_packed
+    from .transactions import CANCEL_COMPUTE_UNITS, build_cancel_instruction
+
     client: Client = ctx.obj["client"]
     program = ctx.obj["program"]
-    streamflow_program = ctx.obj["streamflow_program"]
-    sig = get_first_signature(client, stream_id)
-    if not sig:
-        raise click.ClickException(f"Could not find initial tx for stream {str(stream_id)}")
-    tx = client.get_transaction(sig).value.transaction.transaction
-    accounts = list(tx.message.instructions[-1].accounts)
-    account_keys = list(tx.message.account_keys)
-    sender = account_keys[accounts[0]]
-    recipient = account_keys[accounts[2]]
-    partner = account_keys[accounts[9]]
-    mint = account_keys[accounts[11]]
-    stream_id = account_keys[accounts[6]]
-    proxy_id = account_keys[accounts[4]]
-    stream_program = account_keys[accounts[14]]
-    escrow_tokens, _ = Pubkey.find_program_address([b"strm", bytes(stream_id)], streamflow_program)
-    proxy_tokens, _ = Pubkey.find_program_address(
-        [bytes(proxy_id), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    sender_tokens, _ = Pubkey.find_program_address(
-        [bytes(sender), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    recipient_tokens, _ = Pubkey.find_program_address(
-        [bytes(recipient), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    partner_tokens, _ = Pubkey.find_program_address(
-        [bytes(partner), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    streamflow_treasury_tokens, _ = Pubkey.find_program_address(
-        [bytes(STREAMFLOW_TREASURY), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
-    )
-    accounts = CancelAccounts(
-        sender=authority.pubkey(),
-        sender_tokens=sender_tokens,
-        recipient=recipient,
-        recipient_tokens=recipient_tokens,
-        proxy_metadata=proxy_id,
-        proxy_tokens=proxy_tokens,
-        stream_metadata=stream_id,
-        escrow_tokens=escrow_tokens,
-        streamflow_treasury=STREAMFLOW_TREASURY,
-        streamflow_treasury_tokens=streamflow_treasury_tokens,
-        partner=partner,
-        partner_tokens=partner_tokens,
-        mint=mint,
-        streamflow_program=stream_program,
-    )
-    tx = Transaction(
-        fee_payer=authority.pubkey(),
-        instructions=[
-            set_compute_unit_limit(240_000),
-            set_compute_unit_price(ctx.obj["compute_price"]),
-            cancel_instruction(accounts, program),
-        ],
-    )
-    tx_sig = send_and_confirm_transaction(client, tx, authority)
-    click.echo(f"Tx: {tx_sig}")
+    stream_ids = list(stream_ids)
+    if ids_path is not None:
+        with open(ids_path) as r:
+            stream_ids += [validate_pubkey(ctx, None, line.strip()) for line in r if line.strip()]
+    if sender is not None or mint is not None:
+        contracts = get_contracts(client, program, sender=sender, mint=mint)
+        stream_ids += [contract.stream for _, contract in contracts if not contract.stream_canceled_at]
+    elif not stream_ids:
+        raise click.UsageError("Select streams with --stream-id, --ids, --sender or --mint")
+    stream_ids = list(dict.fromkeys(stream_ids))
+    click.echo(f"Cancelling {len(stream_ids)} streams", err=True)
+
+    writer = csv.writer(output)
+    writer.writerow(["stream_id", "proxy_id", "signature", "error"])
+    cancelable = []
+    for stream_id, proxy_stream in zip(stream_ids, get_proxy_streams(client, program, stream_ids), strict=True):
+        if proxy_stream is None:
+            writer.writerow([stream_id, "", "", "Stream not found"])
+        elif proxy_stream.proxy is None:
+            writer.writerow([stream_id, proxy_stream.proxy_id, "", f"Not managed by proxy program {program}"])
+        elif proxy_stream.stream.closed:
+            writer.writerow([stream_id, proxy_stream.proxy_id, "", "Already closed"])
+        else:
+            cancelable.append(proxy_stream)
+    items = [
+        PackItem([build_cancel_instruction(program, proxy_stream, authority.pubkey())], CANCEL_COMPUTE_UNITS)
+        for proxy_stream in cancelable
+    ]
+    futures = send_packed(ctx.obj["engine"], items, ctx.obj["compute_price"], authority)
+    cancelled = 0
+    for proxy_stream, future in zip(cancelable, futures, strict=True):
+        try:
+            result = [future.result(), ""]
+            cancelled += 1
+        except Exception as e:
+            result = ["", describe(e, ctx.obj["program"])]
+        writer.writerow([proxy_stream.stream_id, proxy_stream.proxy_id, *result])
+        output.flush()
+    click.echo(f"Cancelled {cancelled} of {len(stream_ids)} streams", err=True)
+
+
+@cli.command()
+@click.option(
+    "--key",
+    "authority",
+    show_default=True,
+    default="keeper.json",
+    callback=validate_private_keys_file,
+    help="Path to the keys.json file paying for release updates or base58 encoded private key",
+)
+@click.option(
+    "--delay", show_default=True, default=1, help="Seconds to wait after a release boundary before updating release"
+)
+@click.option(
+    "--rescan-interval", show_default=True, default=600, help="Seconds between full rescans of proxy accounts"
+)
+@click.option("-w", "--window", show_default=True, default=256, help="Maximum number of release updates in flight")
+@click.option(
+    "--update-compute-units",
+    show_default=True,
+    default=50_000,
+    help="Compute units budgeted per release update when packing several into one transaction",
+)
+@click.pass_context
+def keeper(
+    ctx: Context,
+    authority: Keypair,
+    delay: int,
+    rescan_interval: int,
+    window: int,
+    update_compute_units: int,
+):
+    from .accounts import get_contracts
+    from .errors import describe
+    from .keeper import ReleaseScheduler
+
+    client: Client = ctx.obj["client"]
+    program = ctx.obj["program"]
+    scheduler = ReleaseScheduler()
+    in_flight: dict[Future, Pubkey] = {}
+    next_rescan = 0.0
+    backoff = 1.0
+    while True:
+        try:
+            if time.monotonic() >= next_rescan:
+                scheduler.load(get_contracts(client, program), exclude=set(in_flight.values()))
+                click.echo(f"Tracking {len(scheduler)} proxy accounts with pending releases")
+                next_rescan = time.monotonic() + rescan_interval
+            for future in [future for future in in_flight if future.done()]:
+                report_release(scheduler, in_flight.pop(future), future, program)
+            due = scheduler.pop_due(int(time.time()) - delay, window - len(in_flight))
+            if due:
+                in_flight.update(send_release_updates(ctx, scheduler, due, authority, update_compute_units))
+        except Exception as e:
+            click.echo(f"Keeper iteration failed, retrying in {backoff:g}s: {describe(e, program)}", err=True)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, KEEPER_MAX_BACKOFF)
+            continue
+        backoff = 1.0
+        next_due = scheduler.next_due()
+        wait_for = 1.0 if next_due is None else next_due + delay - time.time()
+        time.sleep(min(max(wait_for, 0.05), 1.0))
+
+
+def send_release_updates(
+    ctx: Context,
+    scheduler: ReleaseScheduler,
+    due: list[tuple[Pubkey, int]],
+    authority: Keypair,
+    update_compute_units: int,
+) -> dict[Future, Pubkey]:
+    from solana.rpc.commitment import Confirmed
+
+    from .packing import PackItem, send_packed
+    from .transactions import build_update_release_instruction
+
+    items = [
+        PackItem(
+            [
+                build_update_release_instruction(
+                    ctx.obj["program"],
+                    ctx.obj["streamflow_program"],
+                    authority.pubkey(),
+                    proxy_metadata,
+                    scheduler.contracts[proxy_metadata],
+                )
+            ],
+            update_compute_units,
+        )
+        for proxy_metadata, _ in due
+    ]
+    futures = send_packed(ctx.obj["engine"], items, ctx.obj["compute_price"], authority, commitment=Confirmed)
+    for proxy_metadata, due_at in due:
+        scheduler.advance(proxy_metadata, max(due_at, int(time.time())))
+    return dict(zip(futures, (proxy_metadata for proxy_metadata, _ in due), strict=True))
+
+
+def report_release(scheduler: ReleaseScheduler, proxy_metadata: Pubkey, future: Future, program: Pubkey):
+    from .errors import DONE, PERMANENT, classify, describe, program_error
+
+    try:
+        signature = future.result()
+    except Exception as e:
+        kind = classify(e, program)
+        if kind == DONE and program_error(e, program).name == "AmountAlreadyUpdated":
+            click.echo(f"Release of {proxy_metadata} already updated")
+        elif kind in (PERMANENT, DONE):
+            scheduler.stop(proxy_metadata)
+            click.echo(f"Stopped tracking {proxy_metadata}: {describe(e, program)}", err=True)
+        else:
+            click.echo(f"Failed to update release of {proxy_metadata}: {describe(e, program)}", err=True)
+        return
+    click.echo(f"Updated release of {proxy_metadata}: {signature}")
+
+
+def account_filter_options(func: Callable) -> Callable:
+    options = [
+        click.option(
+            "--index",
+            "index_path",
+            show_default=True,
+            default="non_linear_index.db",
+            help="Path to the local account index",
+        ),
+        click.option("--sender", callback=validate_pubkey_optional, help="Only accounts of this sender"),
+        click.option("--recipient", callback=validate_pubkey_optional, help="Only accounts of this recipient"),
+        click.option("--mint", callback=validate_pubkey_optional, help="Only accounts of this mint"),
+        click.option(
+            "--streams", is_flag=True, default=False, help="Use Streamflow stream accounts instead of proxy accounts"
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def sync_index(
+    ctx: Context,
+    account_index: AccountIndex,
+    sender: Pubkey | None,
+    recipient: Pubkey | None,
+    mint: Pubkey | None,
+    streams: bool,
+) -> int:
+    from .accounts import get_contracts, get_stream_contracts
+
+    client: Client = ctx.obj["client"]
+    prune = sender is None and recipient is None and mint is None
+    if streams:
+        stream_contracts = get_stream_contracts(client, ctx.obj["streamflow_program"], sender, recipient, mint)
+        return account_index.upsert_streams(stream_contracts, prune=prune)
+    contracts = get_contracts(client, ctx.obj["program"], sender, recipient, mint)
+    return account_index.upsert_contracts(contracts, prune=prune)
+
+
+@cli.command()
+@account_filter_options
+@click.pass_context
+def index(
+    ctx: Context,
+    index_path: str,
+    sender: Pubkey | None,
+    recipient: Pubkey | None,
+    mint: Pubkey | None,
+    streams: bool,
+):
+    from .index import AccountIndex
+
+    account_index = AccountIndex(index_path)
+    try:
+        count = sync_index(ctx, account_index, sender, recipient, mint, streams)
+    finally:
+        account_index.close()
+    click.echo(f"Indexed {count} {'stream' if streams else 'proxy'} accounts")
+
+
+@cli.command("list")
+@account_filter_options
+@click.option("--refresh", is_flag=True, default=False, help="Update the index from the chain before listing")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print full decoded accounts as JSON lines")
+@click.pass_context
+def list_accounts(
+    ctx: Context,
+    index_path: str,
+    sender: Pubkey | None,
+    recipient: Pubkey | None,
+    mint: Pubkey | None,
+    streams: bool,
+    refresh: bool,
+    as_json: bool,
+):
+    from .index import AccountIndex
+
+    account_index = AccountIndex(index_path)
+    try:
+        if refresh:
+            sync_index(ctx, account_index, sender, recipient, mint, streams)
+        if streams:
+            accounts = account_index.streams(sender, recipient, mint)
+        else:
+            accounts = account_index.contracts(sender, recipient, mint)
+    finally:
+        account_index.close()
+    for pubkey, account in accounts:
+        if as_json:
+            click.echo(json.dumps({"id": str(pubkey), **account.to_json()}))
+        else:
+            click.echo(
+                f"{pubkey} sender={account.sender} recipient={account.recipient} mint={account.mint} "
+                f"net_amount={account.ix.net_amount_deposited} end_time={account.end_time}"
+            )
+
+
+@cli.command("ledger")
+@click.option("--sender", callback=validate_pubkey_optional, help="Only streams of this sender")
+@click.option("--recipient", callback=validate_pubkey_optional, help="Only streams of this recipient")
+@click.option("--mint", callback=validate_pubkey_optional, help="Only streams of this mint")
+@click.option(
+    "--refresh", is_flag=True, default=False, help="Look up signatures that are not finalized or failed on chain"
+)
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write the streams to as CSV")
+@click.pass_context
+def ledger_report(
+    ctx: Context,
+    sender: Pubkey | None,
+    recipient: Pubkey | None,
+    mint: Pubkey | None,
+    refresh: bool,
+    output: TextIO,
+):
+    ledger: Ledger | None = ctx.obj["ledger"]
+    if ledger is None:
+        raise click.UsageError("Pass the ledger file with --ledger")
+    if refresh:
+        refresh_ledger(ctx, ledger)
+    writer = csv.writer(output)
+    writer.writerow(["stream_id", "proxy_id", "sender", "recipient", "mint", "signature", "status", "error"])
+    writer.writerows(ledger.streams(sender, recipient, mint))
+
+
+def refresh_ledger(ctx: Context, ledger: Ledger) -> int:
+    from solders.signature import Signature
+    from solders.transaction_status import TransactionConfirmationStatus
+
+    from .ledger import FAILED, FINALIZED
+    from .rpc import get_signature_history
+
+    signatures = ledger.unsettled_signatures()
+    statuses = get_signature_history(ctx.obj["client"], [Signature.from_string(item) for item in signatures])
+    updated = 0
+    for signature, status in zip(signatures, statuses, strict=True):
+        if status is None:
+            continue
+        if status.err is not None:
+            ledger.record_status(signature, FAILED, str(status.err))
+        elif status.confirmation_status == TransactionConfirmationStatus.Finalized:
+            ledger.record_status(signature, FINALIZED)
+        else:
+            continue
+        updated += 1
+    return updated
 
 
 def main():
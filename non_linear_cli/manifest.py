@@ -0,0 +1,107 @@
+import csv
+import hashlib
+import hmac
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"", "0", "false", "no", "n"}
+
+
+@dataclass
+class ManifestRow:
+    index: int
+    row_id: str
+    recipient: Pubkey
+    mint: Pubkey
+    start_time: int
+    net_amount: int
+    period: int
+    amount_per_period: int
+    increase_rate: Decimal
+    penalty_rate: Decimal
+    penalized: bool
+    name: str
+
+
+def _get(raw: dict, *keys: str) -> str | None:
+    for key in keys:
+        value = raw.get(key)
+        if value is not None and str(value).strip() != "":
+            return str(value).strip()
+    return None
+
+
+def _require(raw: dict, *keys: str) -> str:
+    value = _get(raw, *keys)
+    if value is None:
+        raise ValueError(f"Missing {keys[0]}")
+    return value
+
+
+def _parse_bool(value: str | None) -> bool:
+    normalized = (value or "").lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f"Not a boolean value: {value}")
+
+
+def _parse_decimal(value: str | None) -> Decimal:
+    try:
+        return Decimal(value or "")
+    except InvalidOperation:
+        raise ValueError(f"Not a decimal value: {value}") from None
+
+
+def manifest_row_id(index: int, raw: dict) -> str:
+    return _get(raw, "id", "row_id") or str(index)
+
+
+def require_row_id(index: int, raw: dict) -> str:
+    row_id = _get(raw, "id", "row_id")
+    if row_id is None:
+        raise ValueError(f"Row {index} has no id")
+    return row_id
+
+
+def derive_stream_keypair(secret: bytes, row_id: str) -> Keypair:
+    return Keypair.from_seed(hmac.new(secret, row_id.encode(), hashlib.sha256).digest())
+
+
+def parse_manifest_row(index: int, raw: dict, defaults: dict) -> ManifestRow:
+    mint = _get(raw, "mint")
+    increase_rate = _get(raw, "increase_rate")
+    penalty_rate = _get(raw, "penalty_rate")
+    penalized = _get(raw, "penalized", "is_penalized")
+    return ManifestRow(
+        index=index,
+        row_id=manifest_row_id(index, raw),
+        recipient=Pubkey.from_string(_require(raw, "recipient")),
+        mint=Pubkey.from_string(mint) if mint else defaults["mint"],
+        start_time=int(_get(raw, "start_time") or defaults["start_time"]),
+        net_amount=int(_get(raw, "net_amount", "net_amount_deposited") or defaults["net_amount"]),
+        period=int(_get(raw, "period") or defaults["period"]),
+        amount_per_period=int(_get(raw, "amount_per_period") or defaults["amount_per_period"]),
+        increase_rate=_parse_decimal(increase_rate) if increase_rate else defaults["increase_rate"],
+        penalty_rate=_parse_decimal(penalty_rate) if penalty_rate else defaults["penalty_rate"],
+        penalized=_parse_bool(penalized) if penalized else defaults["penalized"],
+        name=_get(raw, "name") or defaults["name"],
+    )
+
+
+def read_manifest(path: str) -> Iterator[tuple[int, dict]]:
+    with open(path, newline="") as r:
+        if path.endswith((".jsonl", ".ndjson", ".json")):
+            for index, line in enumerate(r):
+                if line.strip():
+                    yield index, json.loads(line)
+        else:
+            for index, raw in enumerate(csv.DictReader(r)):
+                yield index, raw
@@ -0,0 +1,89 @@
+import json
+from dataclasses import dataclass
+
+from solana.rpc.api import Client
+from solana.transaction import Transaction
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYS_PROGRAM_ID
+from solders.system_program import AdvanceNonceAccountParams, advance_nonce_account, create_nonce_account
+
+from .accounts import get_accounts
+from .confirmation import ConfirmationEngine
+from .packing import PackItem, send_packed
+
+NONCE_ACCOUNT_SIZE = 80
+NONCE_INITIALIZED = 1
+NONCE_COMPUTE_UNITS = 5_000
+NONCE_VALID_BLOCKS = 1_500
+
+
+@dataclass
+class SignedTransaction:
+    row: int
+    recipient: str
+    stream_id: str
+    proxy_id: str
+    nonce_account: str
+    nonce: str
+    signature: str
+    transaction: str
+
+
+def decode_nonce(data: bytes) -> Hash | None:
+    if len(data) != NONCE_ACCOUNT_SIZE or int.from_bytes(data[4:8], "little") != NONCE_INITIALIZED:
+        return None
+    return Hash.from_bytes(data[40:72])
+
+
+def get_nonces(client: Client, nonce_accounts: list[Pubkey]) -> list[Hash | None]:
+    return [
+        decode_nonce(bytes(account.data)) if account is not None and account.owner == SYS_PROGRAM_ID else None
+        for account in get_accounts(client, nonce_accounts)
+    ]
+
+
+def create_nonce_accounts(
+    engine: ConfirmationEngine, payer: Keypair, authority: Pubkey, count: int, compute_price: int
+) -> list[tuple[Pubkey, Exception | None]]:
+    lamports = engine.client.get_minimum_balance_for_rent_exemption(NONCE_ACCOUNT_SIZE).value
+    signers = [Keypair() for _ in range(count)]
+    items = [
+        PackItem(
+            list(create_nonce_account(payer.pubkey(), signer.pubkey(), authority, lamports)),
+            NONCE_COMPUTE_UNITS,
+            (signer,),
+        )
+        for signer in signers
+    ]
+    results = []
+    for signer, future in zip(signers, send_packed(engine, items, compute_price, payer), strict=True):
+        try:
+            future.result()
+            results.append((signer.pubkey(), None))
+        except Exception as e:
+            results.append((signer.pubkey(), e))
+    return results
+
+
+def sign_with_nonce(
+    tx: Transaction, nonce_account: Pubkey, nonce: Hash, authority: Keypair, *signers: Keypair
+) -> tuple[bytes, str]:
+    advance = advance_nonce_account(
+        AdvanceNonceAccountParams(nonce_pubkey=nonce_account, authorized_pubkey=authority.pubkey())
+    )
+    tx.instructions = [advance, *tx.instructions]
+    tx.recent_blockhash = nonce
+    tx.sign(authority, *signers)
+    return tx.serialize(), str(tx.signatures[0])
+
+
+def read_nonce_accounts(path: str) -> list[Pubkey]:
+    with open(path) as r:
+        return [Pubkey.from_string(line.strip()) for line in r if line.strip()]
+
+
+def read_signed(path: str) -> list[SignedTransaction]:
+    with open(path) as r:
+        return [SignedTransaction(**json.loads(line)) for line in r if line.strip()]
@@ -0,0 +1,165 @@
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from solana.rpc.commitment import Commitment, Finalized
+from solana.transaction import Transaction
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+
+from .compute import MAX_COMPUTE_UNITS
+from .confirmation import ConfirmationEngine
+from .errors import instruction_index, transaction_error
+from .lookup import V0Transaction
+
+PACKET_DATA_SIZE = 1232
+MAX_TRANSACTION_ACCOUNTS = 64
+SIGNATURE_SIZE = 64
+OPEN_TRANSACTIONS = 8
+PACKED_COMPUTE_UNIT_OVERHEAD = 1_000
+COMPUTE_BUDGET_INSTRUCTIONS = 2
+
+
+@dataclass
+class PackItem:
+    instructions: list[Instruction]
+    compute_units: int
+    signers: tuple[Keypair, ...] = ()
+
+
+def compute_budget_instructions(compute_units: int, compute_price: int) -> list[Instruction]:
+    return [set_compute_unit_limit(compute_units), set_compute_unit_price(compute_price)]
+
+
+def transaction_size(
+    payer: Pubkey, instructions: Sequence[Instruction], lookup_tables: Sequence[AddressLookupTableAccount] = ()
+) -> tuple[int, int]:
+    if lookup_tables:
+        return V0Transaction(payer, instructions, lookup_tables).size()
+    message = Message(list(instructions), payer)
+    size = 1 + SIGNATURE_SIZE * message.header.num_required_signatures + len(bytes(message))
+    return size, len(message.account_keys)
+
+
+@dataclass
+class PackedTransaction:
+    indices: list[int] = field(default_factory=list)
+    items: list[PackItem] = field(default_factory=list)
+
+    @property
+    def compute_units(self) -> int:
+        return PACKED_COMPUTE_UNIT_OVERHEAD + sum(item.compute_units for item in self.items)
+
+    @property
+    def instructions(self) -> list[Instruction]:
+        return [ix for item in self.items for ix in item.instructions]
+
+    @property
+    def signers(self) -> list[Keypair]:
+        return [signer for item in self.items for signer in item.signers]
+
+    def fits(self, payer: Pubkey, item: PackItem, lookup_tables: Sequence[AddressLookupTableAccount]) -> bool:
+        if self.compute_units + item.compute_units > MAX_COMPUTE_UNITS:
+            return False
+        prefix = compute_budget_instructions(MAX_COMPUTE_UNITS, 1)
+        size, accounts = transaction_size(payer, [*prefix, *self.instructions, *item.instructions], lookup_tables)
+        return size <= PACKET_DATA_SIZE and accounts <= MAX_TRANSACTION_ACCOUNTS
+
+    def add(self, index: int, item: PackItem):
+        self.indices.append(index)
+        self.items.append(item)
+
+    def item_at(self, position: int) -> int | None:
+        position -= COMPUTE_BUDGET_INSTRUCTIONS
+        for i, item in enumerate(self.items):
+            if 0 <= position < len(item.instructions):
+                return i
+            position -= len(item.instructions)
+        return None
+
+    def transaction(
+        self, payer: Pubkey, compute_price: int, lookup_tables: Sequence[AddressLookupTableAccount] = ()
+    ) -> Transaction | V0Transaction:
+        instructions = [*compute_budget_instructions(self.compute_units, compute_price), *self.instructions]
+        if lookup_tables:
+            return V0Transaction(payer, instructions, lookup_tables)
+        return Transaction(fee_payer=payer, instructions=instructions)
+
+
+def pack_instructions(
+    payer: Pubkey, items: Sequence[PackItem], lookup_tables: Sequence[AddressLookupTableAccount] = ()
+) -> list[PackedTransaction]:
+    packed: list[PackedTransaction] = []
+    for index, item in enumerate(items):
+        target = next((tx for tx in packed[-OPEN_TRANSACTIONS:] if tx.fits(payer, item, lookup_tables)), None)
+        if target is None:
+            target = PackedTransaction()
+            packed.append(target)
+        target.add(index, item)
+    return packed
+
+
+def failed_instruction(error: BaseException) -> int | None:
+    return instruction_index(transaction_error(error))
+
+
+def send_packed(
+    engine: ConfirmationEngine,
+    items: Sequence[PackItem],
+    compute_price: int,
+    payer: Keypair,
+    *signers: Keypair,
+    lookup_tables: Sequence[AddressLookupTableAccount] = (),
+    commitment: Commitment = Finalized,
+) -> list[Future]:
+    futures = [Future() for _ in items]
+
+    def submit(packed: PackedTransaction, packed_futures: list[Future], send: Callable[..., Future] = engine.submit):
+        try:
+            tx = packed.transaction(payer.pubkey(), compute_price, lookup_tables)
+            future = send(tx, payer, *signers, *packed.signers, commitment=commitment)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(lambda future: _settle(future, packed, packed_futures, resubmit))
+
+    def resubmit(packed: PackedTransaction, packed_futures: list[Future]):
+        submit(packed, packed_futures, engine.submit_later)
+
+    for packed in pack_instructions(payer.pubkey(), items, lookup_tables):
+        submit(packed, [futures[index] for index in packed.indices])
+    return futures
+
+
+def _settle(
+    future: Future,
+    packed: PackedTransaction,
+    futures: list[Future],
+    resubmit: Callable[[PackedTransaction, list[Future]], None],
+):
+    if future.cancelled():
+        for item in futures:
+            item.cancel()
+        return
+    error = future.exception()
+    if error is None:
+        for item in futures:
+            item.set_result(future.result())
+        return
+    position = failed_instruction(error)
+    failed = None if position is None else packed.item_at(position)
+    if failed is None:
+        for item in futures:
+            item.set_exception(error)
+        return
+    futures[failed].set_exception(error)
+    remaining = PackedTransaction()
+    for i, (index, item) in enumerate(zip(packed.indices, packed.items, strict=True)):
+        if i != failed:
+            remaining.add(index, item)
+    if remaining.items:
+        resubmit(remaining, [future for i, future in enumerate(futures) if i != failed])
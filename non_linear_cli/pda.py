@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from solders.pubkey import Pubkey
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+DEFAULT_MAXSIZE = 65536
+PARALLEL_THRESHOLD = 20_000
+CHUNK_SIZE = 2048
+
+Seeds = Sequence[bytes]
+Derivation = tuple[Seeds, Pubkey]
+
+
+def _key(seeds: Seeds, program_id: Pubkey) -> bytes:
+    return bytes(program_id) + b"".join(len(seed).to_bytes(1, "little") + bytes(seed) for seed in seeds)
+
+
+def _derive(items: list[tuple[list[bytes], bytes]]) -> list[tuple[bytes, int]]:
+    derived = []
+    for seeds, program_id in items:
+        address, bump = Pubkey.find_program_address(seeds, Pubkey.from_bytes(program_id))
+        derived.append((bytes(address), bump))
+    return derived
+
+
+class DerivationCache:
+    def __init__(self, path: str | None = None, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[Pubkey, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._store: sqlite3.Connection | None = None
+        if path is not None:
+            self.open(path)
+
+    def open(self, path: str) -> None:
+        self.close()
+        self._store = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._store:
+            self._store.execute(
+                "CREATE TABLE IF NOT EXISTS derivations "
+                "(key BLOB PRIMARY KEY, address BLOB NOT NULL, bump INTEGER NOT NULL)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: bytes) -> tuple[Pubkey, int] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._store is None:
+            return None
+        row = self._store.execute("SELECT address, bump FROM derivations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        entry = (Pubkey.from_bytes(row[0]), row[1])
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: bytes, entry: tuple[Pubkey, int]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _put(self, items: list[tuple[bytes, tuple[Pubkey, int]]]) -> None:
+        with self._lock:
+            for key, entry in items:
+                self._remember(key, entry)
+            if self._store is not None:
+                with self._store:
+                    self._store.executemany(
+                        "INSERT OR REPLACE INTO derivations VALUES (?, ?, ?)",
+                        [(key, bytes(address), bump) for key, (address, bump) in items],
+                    )
+
+    def find_program_address(self, seeds: Seeds, program_id: Pubkey) -> tuple[Pubkey, int]:
+        key = _key(seeds, program_id)
+        with self._lock:
+            entry = self._get(key)
+        if entry is None:
+            entry = Pubkey.find_program_address(list(seeds), program_id)
+            self._put([(key, entry)])
+        return entry
+
+    def associated_token_address(self, owner: Pubkey, mint: Pubkey) -> Pubkey:
+        address, _ = self.find_program_address(
+            [bytes(owner), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
+        )
+        return address
+
+    def derive_many(self, items: Iterable[Derivation], max_workers: int | None = None) -> list[tuple[Pubkey, int]]:
+        requested = [(list(seeds), program_id) for seeds, program_id in items]
+        keys = [_key(seeds, program_id) for seeds, program_id in requested]
+        results: dict[bytes, tuple[Pubkey, int]] = {}
+        missing: dict[bytes, tuple[list[bytes], bytes]] = {}
+        with self._lock:
+            for key, (seeds, program_id) in zip(keys, requested, strict=True):
+                entry = self._get(key)
+                if entry is not None:
+                    results[key] = entry
+                else:
+                    missing[key] = ([bytes(seed) for seed in seeds], bytes(program_id))
+        if missing:
+            pending = list(missing.values())
+            chunks = [pending[start : start + CHUNK_SIZE] for start in range(0, len(pending), CHUNK_SIZE)]
+            if len(pending) < PARALLEL_THRESHOLD or max_workers == 1 or (os.cpu_count() or 1) == 1:
+                derived = [entry for chunk in chunks for entry in _derive(chunk)]
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    derived = [entry for chunk in executor.map(_derive, chunks) for entry in chunk]
+            computed = [
+                (key, (Pubkey.from_bytes(address), bump)) for key, (address, bump) in zip(missing, derived, strict=True)
+            ]
+            self._put(computed)
+            results.update(computed)
+        return [results[key] for key in keys]
+
+
+derivations = DerivationCache()
+
+
+def find_program_address(seeds: Seeds, program_id: Pubkey) -> Pubkey:
+    address, _ = derivations.find_program_address(seeds, program_id)
+    return address
+
+
+def associated_token_address(owner: Pubkey, mint: Pubkey) -> Pubkey:
+    return derivations.associated_token_address(owner, mint)
+
+
+def derive_many(items: Iterable[Derivation], max_workers: int | None = None) -> list[Pubkey]:
+    return [address for address, _ in derivations.derive_many(items, max_workers)]
@@ -0,0 +1,269 @@
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, TypeVar, get_args
+
+import httpx
+from solana.exceptions import SolanaRpcException, handle_exceptions
+from solana.rpc.api import Client
+from solana.rpc.commitment import Commitment
+from solana.rpc.core import _COMMITMENT_TO_SOLDERS, RPCException
+from solana.rpc.providers.base import BaseProvider
+from solana.rpc.providers.core import _after_request_unparsed
+from solana.rpc.providers.http import HTTPProvider
+from solders.rpc.config import RpcContextConfig
+from solders.rpc.requests import Body, GetBlockHeight, GetSignatureStatuses, SendRawTransaction
+from solders.rpc.responses import GetBlockHeightResp, GetSignatureStatusesResp, RPCError
+from solders.signature import Signature
+from solders.transaction_status import TransactionStatus
+
+T = TypeVar("T")
+
+LATENCY_WINDOW = 64
+MIN_HEDGE_SAMPLES = 16
+DEFAULT_HEDGE_DELAY = 1.0
+FAILURE_THRESHOLD = 3
+COOLDOWN = 30.0
+PROBE_INTERVAL = 10.0
+WRITE_REQUESTS = (SendRawTransaction,)
+MAX_BATCH_REQUESTS = 20
+MAX_KEEPALIVE_CONNECTIONS = 64
+MAX_SIGNATURES_PER_STATUS_REQUEST = 256
+
+
+class KeepAliveHTTPProvider(HTTPProvider):
+    def __init__(self, endpoint: str, timeout: float = 10):
+        super().__init__(endpoint, timeout=timeout)
+        self.session = httpx.Client(
+            timeout=timeout, limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+        )
+        self._raw_ids = itertools.count()
+
+    @handle_exceptions(SolanaRpcException, httpx.HTTPError)
+    def make_request_unparsed(self, body: Body) -> str:
+        return _after_request_unparsed(self.session.post(**self._before_request(body)))
+
+    @handle_exceptions(SolanaRpcException, httpx.HTTPError)
+    def make_raw_request_unparsed(self, method: str, params: list) -> str:
+        body = {"jsonrpc": "2.0", "id": next(self._raw_ids), "method": method, "params": params}
+        return _after_request_unparsed(self.session.post(**self._build_common_request_kwargs(), json=body))
+
+    def make_raw_request(self, method: str, params: list) -> Any:
+        response = json.loads(self.make_raw_request_unparsed(method, params))
+        if "error" in response:
+            raise RPCException(response["error"])
+        return response["result"]
+
+    @handle_exceptions(SolanaRpcException, httpx.HTTPError)
+    def make_batch_request_unparsed(self, reqs: tuple[Body, ...]) -> str:
+        return _after_request_unparsed(self.session.post(**self._before_batch_request(reqs)))
+
+    def close(self):
+        self.session.close()
+
+
+class Endpoint:
+    def __init__(self, url: str, provider: KeepAliveHTTPProvider):
+        self.url = url
+        self.provider = provider
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.outcomes: deque[bool] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.sampled_at = 0.0
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return self.url
+
+    @property
+    def latency(self) -> float:
+        with self._lock:
+            if not self.latencies or time.monotonic() - self.sampled_at > PROBE_INTERVAL:
+                return 0.0
+            return sorted(self.latencies)[len(self.latencies) // 2]
+
+    @property
+    def p95(self) -> float | None:
+        with self._lock:
+            if len(self.latencies) < MIN_HEDGE_SAMPLES:
+                return None
+            return sorted(self.latencies)[int(len(self.latencies) * 0.95)]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def available(self, now: float) -> bool:
+        return self.opened_until <= now
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.sampled_at = time.monotonic()
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.opened_until = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURE_THRESHOLD:
+                self.opened_until = time.monotonic() + COOLDOWN
+
+    def call(self, method: Callable[[BaseProvider], T]) -> T:
+        started_at = time.monotonic()
+        try:
+            result = method(self.provider)
+        except SolanaRpcException:
+            self.record_failure()
+            raise
+        self.record_success(time.monotonic() - started_at)
+        return result
+
+
+class RpcPool(BaseProvider):
+    def __init__(self, endpoints: Sequence[str], hedge: bool = False, timeout: float = 10, max_workers: int = 64):
+        self.endpoints = [Endpoint(url, KeepAliveHTTPProvider(url, timeout=timeout)) for url in endpoints]
+        self.endpoint_uri = self.endpoints[0].url
+        self.hedge = hedge
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._max_workers = max_workers
+
+    def __str__(self) -> str:
+        return f"RPC pool {', '.join(map(str, self.endpoints))}"
+
+    def ranked(self) -> list[Endpoint]:
+        now = time.monotonic()
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        if not healthy:
+            return sorted(self.endpoints, key=lambda endpoint: endpoint.opened_until)[:1]
+        return sorted(healthy, key=lambda endpoint: endpoint.latency * (1 + endpoint.error_rate))
+
+    def _submit(self, endpoint: Endpoint, method: Callable[[BaseProvider], T]) -> Future:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="rpc-pool")
+        return self._executor.submit(endpoint.call, method)
+
+    def _failover(self, endpoints: list[Endpoint], method: Callable[[BaseProvider], T]) -> T:
+        error: SolanaRpcException | None = None
+        for endpoint in endpoints:
+            try:
+                return endpoint.call(method)
+            except SolanaRpcException as e:
+                error = e
+        raise error
+
+    def _hedged(self, primary: Endpoint, secondary: Endpoint, method: Callable[[BaseProvider], T]) -> T:
+        first = self._submit(primary, method)
+        try:
+            return first.result(timeout=primary.p95 or DEFAULT_HEDGE_DELAY)
+        except TimeoutError:
+            pass
+        except SolanaRpcException:
+            return secondary.call(method)
+        attempts = {first, self._submit(secondary, method)}
+        error: BaseException | None = None
+        while attempts:
+            done, attempts = wait(attempts, return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+        raise error
+
+    def _route(self, method: Callable[[BaseProvider], T], hedge: bool) -> T:
+        endpoints = self.ranked()
+        if hedge and len(endpoints) > 1:
+            try:
+                return self._hedged(endpoints[0], endpoints[1], method)
+            except SolanaRpcException:
+                if len(endpoints) == 2:
+                    raise
+                return self._failover(endpoints[2:], method)
+        return self._failover(endpoints, method)
+
+    def make_request(self, body: Body, parser: type[T]) -> T:
+        hedge = self.hedge and not isinstance(body, WRITE_REQUESTS)
+        return self._route(lambda provider: provider.make_request(body, parser), hedge)
+
+    def make_request_unparsed(self, body: Body) -> str:
+        return self._route(lambda provider: provider.make_request_unparsed(body), False)
+
+    def make_batch_request_unparsed(self, reqs: tuple[Body, ...]) -> str:
+        return self._route(lambda provider: provider.make_batch_request_unparsed(reqs), False)
+
+    def make_batch_request(self, reqs: tuple[Body, ...], parsers: Any) -> Any:
+        return self._route(lambda provider: provider.make_batch_request(reqs, parsers), False)
+
+    def make_raw_request(self, method: str, params: list) -> Any:
+        return self._route(lambda provider: provider.make_raw_request(method, params), self.hedge)
+
+    def is_connected(self) -> bool:
+        return any(endpoint.provider.is_connected() for endpoint in self.ranked())
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        for endpoint in self.endpoints:
+            endpoint.provider.close()
+
+
+class PooledClient(Client):
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        commitment: Commitment | None = None,
+        hedge: bool = False,
+        timeout: float = 10,
+    ):
+        super().__init__(endpoints[0], commitment, timeout=timeout)
+        self._provider = RpcPool(endpoints, hedge=hedge, timeout=timeout)
+
+    def batch(self, bodies: Sequence[Body], parsers: Sequence[type]) -> list:
+        results = []
+        for start in range(0, len(bodies), MAX_BATCH_REQUESTS):
+            chunk = tuple(bodies[start : start + MAX_BATCH_REQUESTS])
+            results += self._provider.make_batch_request(chunk, tuple(parsers[start : start + MAX_BATCH_REQUESTS]))
+        for result in results:
+            if isinstance(result, get_args(RPCError)):
+                raise RPCException(result)
+        return results
+
+    def raw_request(self, method: str, params: list) -> Any:
+        return self._provider.make_raw_request(method, params)
+
+    def close(self):
+        self._provider.close()
+
+
+def get_block_height_and_statuses(
+    client: Client, commitment: Commitment, signatures: Sequence[Signature], chunk_size: int
+) -> tuple[int, list[TransactionStatus | None]]:
+    chunks = [list(signatures[start : start + chunk_size]) for start in range(0, len(signatures), chunk_size)]
+    if not isinstance(client, PooledClient):
+        block_height = client.get_block_height(commitment).value
+        return block_height, [status for chunk in chunks for status in client.get_signature_statuses(chunk).value]
+    bodies = [GetBlockHeight(RpcContextConfig(commitment=_COMMITMENT_TO_SOLDERS[commitment]))]
+    bodies += [GetSignatureStatuses(chunk) for chunk in chunks]
+    parsers = [GetBlockHeightResp] + [GetSignatureStatusesResp] * len(chunks)
+    block_height, *responses = client.batch(bodies, parsers)
+    return block_height.value, [status for response in responses for status in response.value]
+
+
+def get_signature_history(client: Client, signatures: list[Signature]) -> list[TransactionStatus | None]:
+    statuses: list[TransactionStatus | None] = []
+    for start in range(0, len(signatures), MAX_SIGNATURES_PER_STATUS_REQUEST):
+        chunk = signatures[start : start + MAX_SIGNATURES_PER_STATUS_REQUEST]
+        statuses += client.get_signature_statuses(chunk, search_transaction_history=True).value
+    return statuses
@@ -0,0 +1,146 @@
+import typing
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+RATE_PRECISION = 10**9
+U64_MAX = 2**64 - 1
+DEFAULT_MAX_PERIODS = 1000
+
+IntValues = int | Sequence[int]
+RateValues = Decimal | Sequence[Decimal]
+FlagValues = bool | Sequence[bool]
+
+
+def _numpy() -> typing.Any:
+    from .decoder import _numpy
+
+    return _numpy("Simulation")
+
+
+@dataclass
+class Schedules:
+    start_time: "np.ndarray"
+    period: "np.ndarray"
+    net_amount_deposited: "np.ndarray"
+    amounts: "np.ndarray"
+    unlocked: "np.ndarray"
+    withdrawn: "np.ndarray"
+    completed_period: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.start_time)
+
+    @property
+    def periods(self) -> int:
+        return self.amounts.shape[1]
+
+    def period_end_times(self) -> "np.ndarray":
+        np = _numpy()
+        return self.start_time[:, None] + self.period[:, None] * np.arange(1, self.periods + 1, dtype=np.uint64)
+
+    def end_time(self) -> "np.ndarray":
+        np = _numpy()
+        return np.where(
+            self.completed_period >= 0,
+            self.start_time + self.period * (self.completed_period + 1).astype(np.uint64),
+            0,
+        )
+
+
+def _rates(values: RateValues) -> list[int]:
+    if isinstance(values, Decimal | int | float | str):
+        values = [values]
+    return [int(Decimal(value) * RATE_PRECISION) for value in values]
+
+
+def apply_rate(amounts: "np.ndarray", rates: "np.ndarray", cap: "np.ndarray") -> "np.ndarray":
+    np = _numpy()
+    whole, fraction = np.divmod(amounts, np.uint64(RATE_PRECISION))
+    overflow = whole > np.uint64(U64_MAX) // np.maximum(rates, np.uint64(1))
+    with np.errstate(over="ignore"):
+        scaled = whole * rates + fraction * rates // np.uint64(RATE_PRECISION)
+    return np.minimum(np.where(overflow, cap, scaled), cap)
+
+
+def _count_reached(thresholds: "np.ndarray", rows: "np.ndarray", values: "np.ndarray") -> "np.ndarray":
+    np = _numpy()
+    low = np.zeros(len(rows), dtype=np.int64)
+    high = np.full(len(rows), thresholds.shape[1], dtype=np.int64)
+    while np.any(low < high):
+        middle = (low + high) // 2
+        reached = thresholds[rows, np.minimum(middle, thresholds.shape[1] - 1)] <= values
+        active = low < high
+        low = np.where(active & reached, middle + 1, low)
+        high = np.where(active & ~reached, middle, high)
+    return low
+
+
+def simulate(
+    start_time: IntValues,
+    net_amount_deposited: IntValues,
+    period: IntValues,
+    amount_per_period: IntValues,
+    increase_rate: RateValues,
+    penalty_rate: RateValues,
+    is_penalized: FlagValues,
+    withdraw_every: int = 0,
+    max_periods: int = DEFAULT_MAX_PERIODS,
+) -> Schedules:
+    np = _numpy()
+    start_time, net, period, initial, increase, penalty, penalized = np.broadcast_arrays(
+        np.asarray(start_time, dtype=np.uint64),
+        np.asarray(net_amount_deposited, dtype=np.uint64),
+        np.asarray(period, dtype=np.uint64),
+        np.asarray(amount_per_period, dtype=np.uint64),
+        np.asarray(_rates(increase_rate), dtype=np.uint64),
+        np.asarray(_rates(penalty_rate), dtype=np.uint64),
+        np.asarray(is_penalized, dtype=bool),
+    )
+    count = len(net)
+    rows = np.arange(count)
+
+    steps = [np.minimum(initial, net)]
+    thresholds = [np.zeros(count, dtype=np.uint64), steps[0].copy()]
+    while len(steps) < max_periods and np.any((thresholds[-1] < net) & (steps[-1] > 0)):
+        steps.append(apply_rate(steps[-1], increase, net))
+        thresholds.append(np.minimum(thresholds[-1] + steps[-1], net))
+    step_table = np.stack(steps, axis=1)
+    threshold_table = np.stack(thresholds[:-1], axis=1)
+    last_step = step_table.shape[1] - 1
+
+    released = np.zeros(count, dtype=np.uint64)
+    withdrawn = np.zeros(count, dtype=np.uint64)
+    amount = step_table[:, 0].copy()
+    amounts, unlocked, withdrawn_columns = [], [], []
+    for t in range(max_periods):
+        unlock = np.minimum(amount, net - released)
+        released += unlock
+        if withdraw_every and (t + 1) % withdraw_every == 0:
+            withdrawn = released.copy()
+        amounts.append(unlock)
+        unlocked.append(released.copy())
+        withdrawn_columns.append(withdrawn.copy())
+        amount = step_table[:, t + 1] if t < last_step else np.zeros_like(amount)
+        if withdraw_every:
+            available = released - withdrawn
+            effective = np.where(withdrawn > 0, apply_rate(available, penalty, available), available)
+            step = _count_reached(threshold_table, rows, effective) - 1
+            amount = np.where(penalized, step_table[rows, np.clip(step, 0, last_step)], amount)
+        if not np.any((released < net) & (amount > 0)):
+            break
+
+    unlocked_table = np.stack(unlocked, axis=1)
+    complete = unlocked_table >= net[:, None]
+    return Schedules(
+        start_time=start_time,
+        period=period,
+        net_amount_deposited=net,
+        amounts=np.stack(amounts, axis=1),
+        unlocked=unlocked_table,
+        withdrawn=np.stack(withdrawn_columns, axis=1),
+        completed_period=np.where(complete.any(axis=1), complete.argmax(axis=1), -1),
+    )
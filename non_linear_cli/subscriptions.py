@@ -0,0 +1,127 @@
+import itertools
+import json
+import threading
+from collections.abc import Callable
+
+from solana.rpc.commitment import Commitment
+from solders.signature import Signature
+from websockets.sync.client import ClientConnection, connect
+
+
+def websocket_url(http_url: str) -> str:
+    if http_url.startswith("https://"):
+        return "wss://" + http_url.removeprefix("https://")
+    if http_url.startswith("http://"):
+        return "ws://" + http_url.removeprefix("http://")
+    return http_url
+
+
+class SignatureSubscriber:
+    def __init__(
+        self,
+        url: str,
+        on_notification: Callable[[Signature, dict | None], None],
+        on_disconnect: Callable[[], None] | None = None,
+        reconnect_delay: float = 1.0,
+    ):
+        self.url = url
+        self.on_notification = on_notification
+        self.on_disconnect = on_disconnect
+        self.reconnect_delay = reconnect_delay
+        self.connected = threading.Event()
+        self._signatures: dict[Signature, Commitment] = {}
+        self._requests: dict[int, Signature] = {}
+        self._subscriptions: dict[int, Signature] = {}
+        self._subscription_ids: dict[Signature, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._connection: ClientConnection | None = None
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, signature: Signature, commitment: Commitment):
+        with self._lock:
+            self._signatures[signature] = commitment
+            self._ensure_running()
+            if self.connected.is_set():
+                self._send_subscribe(signature, commitment)
+
+    def forget(self, signature: Signature):
+        with self._lock:
+            self._signatures.pop(signature, None)
+            subscription = self._subscription_ids.pop(signature, None)
+            if subscription is None:
+                return
+            del self._subscriptions[subscription]
+            if self.connected.is_set():
+                self._send("signatureUnsubscribe", [subscription])
+
+    def close(self):
+        self._closed.set()
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _ensure_running(self):
+        if not self._closed.is_set() and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="signature-subscriber", daemon=True)
+            self._thread.start()
+
+    def _send(self, method: str, params: list) -> int:
+        request_id = next(self._ids)
+        try:
+            self._connection.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        except Exception:
+            self.connected.clear()
+        return request_id
+
+    def _send_subscribe(self, signature: Signature, commitment: Commitment):
+        request_id = self._send("signatureSubscribe", [str(signature), {"commitment": commitment}])
+        self._requests[request_id] = signature
+
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                with connect(self.url) as connection:
+                    with self._lock:
+                        self._connection = connection
+                        self._requests.clear()
+                        self._subscriptions.clear()
+                        self._subscription_ids.clear()
+                        self.connected.set()
+                        for signature, commitment in self._signatures.items():
+                            self._send_subscribe(signature, commitment)
+                    for message in connection:
+                        self._handle(json.loads(message))
+            except Exception:
+                pass
+            finally:
+                self.connected.clear()
+                self._connection = None
+            if self.on_disconnect is not None:
+                self.on_disconnect()
+            self._closed.wait(self.reconnect_delay)
+
+    def _handle(self, message: dict):
+        if message.get("method") == "signatureNotification":
+            params = message["params"]
+            with self._lock:
+                signature = self._subscriptions.pop(params["subscription"], None)
+                if signature is not None:
+                    self._signatures.pop(signature, None)
+                    self._subscription_ids.pop(signature, None)
+            if signature is not None:
+                value = params["result"]["value"]
+                self.on_notification(signature, value.get("err") if isinstance(value, dict) else None)
+            return
+        request_id = message.get("id")
+        with self._lock:
+            signature = self._requests.pop(request_id, None)
+            if signature is not None and isinstance(message.get("result"), int):
+                if signature in self._signatures:
+                    self._subscriptions[message["result"]] = signature
+                    self._subscription_ids[signature] = message["result"]
+                else:
+                    self._send("signatureUnsubscribe", [message["result"]])
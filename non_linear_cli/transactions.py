@@ -0,0 +1,245 @@
+import hashlib
+from collections.abc import Iterable
+from decimal import Decimal
+
+from borsh_construct import U64, CStruct
+from solana.rpc.api import Client
+from solana.transaction import Transaction
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYS_PROGRAM_ID
+from solders.sysvar import RENT
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+from .accounts import ProxyStream, get_accounts
+from .client.instructions import (
+    CancelAccounts,
+    CreateAccounts,
+    CreateArgs,
+    UpdateReleaseAccounts,
+)
+from .client.instructions import (
+    cancel as cancel_instruction,
+)
+from .client.instructions import (
+    create as create_instruction,
+)
+from .client.instructions import (
+    update_release as update_release_instruction,
+)
+from .client.types import Contract, CreateParams, StreamContract
+from .pda import associated_token_address, find_program_address
+from .schedule import RATE_PRECISION
+
+withdraw_stream_struct = CStruct(
+    "amount" / U64,
+)
+
+STREAMFLOW_TREASURY = Pubkey.from_string("5SEpbdjFK5FxwTvfsGMXVQTD2v4M2c5tyRTxhdsPkgDw")
+WITHDRAWOR = Pubkey.from_string("wdrwhnCv4pzW8beKsbPa4S2UDZrXenjg16KJdKSpb5u")
+FEE_ORACLE = Pubkey.from_string("B743wFVk2pCYhV91cn287e1xY7f1vt4gdY48hhNiuQmT")
+CREATE_COMPUTE_UNITS = 300_000
+TOKEN_ACCOUNT_COMPUTE_UNITS = 30_000
+WITHDRAW_COMPUTE_UNITS = 200_000
+CANCEL_COMPUTE_UNITS = 240_000
+
+
+def build_create_params(
+    start_time: int,
+    net_amount_deposited: int,
+    period: int,
+    amount_per_period: int,
+    name: str,
+    increase_rate: Decimal,
+    penalty_rate: Decimal,
+    is_penalized: bool,
+) -> CreateParams:
+    encoded_name = name.encode()
+    name_byte_array = bytearray(64)
+    name_byte_array[0 : len(encoded_name)] = encoded_name
+    return CreateParams(
+        start_time=start_time,
+        net_amount_deposited=net_amount_deposited,
+        period=period,
+        amount_per_period=amount_per_period,
+        cliff=0,
+        cliff_amount=0,
+        cancelable_by_sender=True,
+        cancelable_by_recipient=True,
+        automatic_withdrawal=False,
+        transferable_by_sender=False,
+        transferable_by_recipient=False,
+        can_topup=False,
+        stream_name=list(name_byte_array),
+        withdraw_frequency=0,
+        pausable=False,
+        can_update_rate=False,
+        increase_rate=int(increase_rate * RATE_PRECISION),
+        penalty_rate=int(penalty_rate * RATE_PRECISION),
+        is_penalized=is_penalized,
+    )
+
+
+def build_create_instructions(
+    program: Pubkey,
+    streamflow_program: Pubkey,
+    sender: Pubkey,
+    recipient: Pubkey,
+    mint: Pubkey,
+    stream_metadata: Pubkey,
+    params: CreateParams,
+    token_account_owners: Iterable[Pubkey] = (),
+) -> tuple[list[Instruction], Pubkey]:
+    proxy_metadata = find_program_address([bytes(stream_metadata)], program)
+    escrow_tokens = find_program_address([b"strm", bytes(stream_metadata)], streamflow_program)
+    proxy_tokens = associated_token_address(proxy_metadata, mint)
+    sender_tokens = associated_token_address(sender, mint)
+    recipient_tokens = associated_token_address(recipient, mint)
+    args = CreateArgs(ix=params)
+    accounts = CreateAccounts(
+        sender=sender,
+        sender_tokens=sender_tokens,
+        recipient=recipient,
+        recipient_tokens=recipient_tokens,
+        proxy_metadata=proxy_metadata,
+        proxy_tokens=proxy_tokens,
+        stream_metadata=stream_metadata,
+        escrow_tokens=escrow_tokens,
+        withdrawor=WITHDRAWOR,
+        partner=sender,
+        partner_tokens=sender_tokens,
+        mint=mint,
+        fee_oracle=FEE_ORACLE,
+        streamflow_program=streamflow_program,
+    )
+    instructions = [create_token_account_idempotent(sender, owner, mint) for owner in token_account_owners]
+    instructions.append(create_instruction(args, accounts, program))
+    return instructions, proxy_metadata
+
+
+def create_compute_units(instructions: list[Instruction]) -> int:
+    return CREATE_COMPUTE_UNITS + TOKEN_ACCOUNT_COMPUTE_UNITS * (len(instructions) - 1)
+
+
+def build_create_transaction(
+    program: Pubkey,
+    streamflow_program: Pubkey,
+    compute_price: int,
+    sender: Pubkey,
+    recipient: Pubkey,
+    mint: Pubkey,
+    stream_metadata: Pubkey,
+    params: CreateParams,
+    token_account_owners: Iterable[Pubkey] = (),
+) -> tuple[Transaction, Pubkey]:
+    instructions, proxy_metadata = build_create_instructions(
+        program, streamflow_program, sender, recipient, mint, stream_metadata, params, token_account_owners
+    )
+    tx = Transaction(
+        fee_payer=sender,
+        instructions=[
+            set_compute_unit_limit(create_compute_units(instructions)),
+            set_compute_unit_price(compute_price),
+            *instructions,
+        ],
+    )
+    return tx, proxy_metadata
+
+
+def create_lookup_addresses(streamflow_program: Pubkey, sender: Pubkey, mint: Pubkey) -> list[Pubkey]:
+    return [
+        RENT,
+        SYS_PROGRAM_ID,
+        TOKEN_PROGRAM_ID,
+        ASSOCIATED_TOKEN_PROGRAM_ID,
+        WITHDRAWOR,
+        FEE_ORACLE,
+        STREAMFLOW_TREASURY,
+        associated_token_address(STREAMFLOW_TREASURY, mint),
+        streamflow_program,
+        mint,
+        associated_token_address(sender, mint),
+    ]
+
+
+def create_token_account_idempotent(payer: Pubkey, owner: Pubkey, mint: Pubkey) -> Instruction:
+    return Instruction(
+        program_id=ASSOCIATED_TOKEN_PROGRAM_ID,
+        data=bytes([1]),
+        accounts=[
+            AccountMeta(payer, True, True),
+            AccountMeta(associated_token_address(owner, mint), False, True),
+            AccountMeta(owner, False, False),
+            AccountMeta(mint, False, False),
+            AccountMeta(SYS_PROGRAM_ID, False, False),
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+        ],
+    )
+
+
+def get_missing_token_account_owners(client: Client, owners: Iterable[Pubkey], mint: Pubkey) -> list[Pubkey]:
+    owners = list(dict.fromkeys(owners))
+    if not owners:
+        return []
+    addresses = [associated_token_address(owner, mint) for owner in owners]
+    accounts = get_accounts(client, addresses)
+    return [owner for owner, account in zip(owners, accounts, strict=True) if account is None]
+
+
+def build_withdraw_instruction(
+    streamflow_program: Pubkey, stream_id: Pubkey, stream: StreamContract, authority: Pubkey, amount: int
+) -> Instruction:
+    args = withdraw_stream_struct.build({"amount": amount})
+    ix_id = hashlib.sha256(b"global:withdraw").digest()[:8]
+    return Instruction(
+        program_id=streamflow_program,
+        data=bytes(ix_id) + bytes(args) + bytes(10),
+        accounts=[
+            AccountMeta(authority, True, True),
+            AccountMeta(stream.recipient, False, True),
+            AccountMeta(stream.recipient_tokens, False, True),
+            AccountMeta(stream_id, False, True),
+            AccountMeta(stream.escrow_tokens, False, True),
+            AccountMeta(stream.streamflow_treasury, False, True),
+            AccountMeta(stream.streamflow_treasury_tokens, False, True),
+            AccountMeta(stream.partner, False, True),
+            AccountMeta(stream.partner_tokens, False, True),
+            AccountMeta(stream.mint, False, False),
+            AccountMeta(TOKEN_PROGRAM_ID, False, False),
+        ],
+    )
+
+
+def build_cancel_instruction(program: Pubkey, proxy_stream: ProxyStream, authority: Pubkey) -> Instruction:
+    stream = proxy_stream.stream
+    accounts = CancelAccounts(
+        sender=authority,
+        sender_tokens=proxy_stream.proxy.sender_tokens,
+        recipient=stream.recipient,
+        recipient_tokens=stream.recipient_tokens,
+        proxy_metadata=proxy_stream.proxy_id,
+        proxy_tokens=stream.sender_tokens,
+        stream_metadata=proxy_stream.stream_id,
+        escrow_tokens=stream.escrow_tokens,
+        streamflow_treasury=stream.streamflow_treasury,
+        streamflow_treasury_tokens=stream.streamflow_treasury_tokens,
+        partner=stream.partner,
+        partner_tokens=stream.partner_tokens,
+        mint=stream.mint,
+        streamflow_program=proxy_stream.streamflow_program,
+    )
+    return cancel_instruction(accounts, program)
+
+
+def build_update_release_instruction(
+    program: Pubkey, streamflow_program: Pubkey, authority: Pubkey, proxy_metadata: Pubkey, contract: Contract
+) -> Instruction:
+    accounts = UpdateReleaseAccounts(
+        sender=authority,
+        proxy_metadata=proxy_metadata,
+        stream_metadata=contract.stream,
+        withdrawor=WITHDRAWOR,
+        streamflow_program=streamflow_program,
+    )
+    return update_release_instruction(accounts, program)